@@ -0,0 +1,82 @@
+"""
+Набор замеров сниппетов.
+
+Запуск:
+    python -m benchmarks run [-k 'flat.*'] [-o baseline.json]
+    python -m benchmarks compare baseline.json [current.json] [-k 'flat.*'] [--threshold 0.1]
+
+`compare` без второго файла выполняет замеры заново и завершается с кодом 1, если есть регрессии,
+и с кодом 2, если сравнивать нечего (ни один замер базовой линии не найден в текущих результатах).
+"""
+
+import argparse
+import fnmatch
+import sys
+
+from benchmarks import harness, suite  # noqa: F401  # suite регистрирует замеры
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def _print_results(results: dict[str, harness.Measurement]) -> None:
+    for name, m in results.items():
+        print(f"{name:<36} {_format_time(m.median)}  IQR {_format_time(m.iqr)}  ({m.repeat}x{m.number})")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="выполнить замеры")
+    run_parser.add_argument("-o", "--output", help="сохранить результаты в JSON (базовая линия)")
+
+    compare_parser = commands.add_parser("compare", help="сравнить с базовой линией")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", help="результаты; по умолчанию - новый прогон")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="допустимое замедление медианы")
+
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument("-k", "--pattern", default="*", help="glob по именам замеров")
+        command_parser.add_argument("--repeat", type=int, default=7)
+        command_parser.add_argument("--warmup", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = harness.run(args.pattern, repeat=args.repeat, warmup=args.warmup)
+        _print_results(results)
+        if args.output:
+            harness.dump(results, args.output)
+        return 0
+
+    baseline = harness.load(args.baseline)
+    if args.current:
+        current = {n: m for n, m in harness.load(args.current).items() if fnmatch.fnmatchcase(n, args.pattern)}
+    else:
+        current = harness.run(args.pattern, repeat=args.repeat, warmup=args.warmup)
+    comparisons = harness.compare(baseline, current)
+    regressions = 0
+    for comparison in comparisons:
+        regressed = comparison.is_regression(args.threshold)
+        regressions += regressed
+        mark = "REGRESSION" if regressed else ""
+        print(
+            f"{comparison.name:<36} {_format_time(comparison.baseline.median)} -> "
+            f"{_format_time(comparison.current.median)}  x{comparison.ratio:.2f}  {mark}"
+        )
+    for name in baseline:
+        if name not in current and fnmatch.fnmatchcase(name, args.pattern):
+            print(f"{name:<36} MISSING")
+    if not comparisons:
+        print("nothing to compare: no benchmarks in common with the baseline", file=sys.stderr)
+        return 2
+    print(f"{regressions} regression(s), threshold {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
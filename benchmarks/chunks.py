@@ -0,0 +1,64 @@
+"""
+Сравнение чтения большого файла построчно одним процессом и `parallel_map_file_chunks` на N процессах.
+
+Запуск: `python -m benchmarks.chunks [размер файла в МБ]`
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from snippets.chunks import chunked, parallel_map_file_chunks
+
+CHUNK_SIZE = 10_000
+
+
+def count_errors(lines: list[bytes]) -> int:
+    """Типичная обработка лога: разбор и фильтрация строк."""
+    return sum(1 for line in lines if line.split(b" ", 3)[2] == b"ERROR")
+
+
+def write_log(path: str, size_mb: int) -> None:
+    levels = (b"INFO", b"DEBUG", b"WARNING", b"ERROR")
+    block = b"".join(
+        b"2024-01-01 12:00:%02d %s request_id=%d path=/api/v1/items status=200\n" % (i % 60, levels[i % 4], i)
+        for i in range(10_000)
+    )
+    with open(path, "wb") as file:
+        for _ in range(size_mb * 1024 * 1024 // len(block) + 1):
+            file.write(block)
+
+
+def timed(func: Callable[[], int]) -> tuple[float, int]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def single_reader(path: str) -> int:
+    with open(path, "rb") as file:
+        return sum(count_errors(chunk) for chunk in chunked(file, CHUNK_SIZE))
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.log")
+        write_log(path, size_mb)
+
+        baseline, expected = timed(lambda: single_reader(path))
+        print(f"{'single reader':<16} {baseline:7.2f} s  x1.00")
+        processes = 1
+        while processes <= (os.cpu_count() or 1):
+            elapsed, result = timed(
+                lambda: sum(parallel_map_file_chunks(count_errors, path, CHUNK_SIZE, processes=processes))
+            )
+            assert result == expected
+            print(f"{f'{processes} processes':<16} {elapsed:7.2f} s  x{baseline / elapsed:.2f}")
+            processes *= 2
+
+
+if __name__ == "__main__":
+    main()
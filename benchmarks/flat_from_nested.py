@@ -0,0 +1,122 @@
+"""
+Сравнение скорости преобразования вложенной записи в плоский словарь.
+
+Запуск: `python -m benchmarks.flat_from_nested`
+"""
+
+import timeit
+from typing import Any, Callable, Hashable, Mapping
+
+from snippets.flat_from_nested import (
+    NestedMapping,
+    compile_flattener,
+    get_flat_dict_from_nested_mapping,
+    unflatten,
+)
+
+# запись из `tests/test_snippets/test_to_flat_dict.py::test_real_data`
+REAL_DATA: dict[Hashable, Any] = {
+    "name": "Ravagh",
+    "type": "Persian",
+    "address": {
+        "street": {
+            "line1": "11 E 30th St",
+            "line2": "APT 1",
+        },
+        "city": "New York",
+        "state": "NY",
+        "zip": 10016,
+    },
+}
+
+
+# широкий документ: 200 разделов по 20 полей, из которых нужны 20 полей одного раздела
+WIDE_DATA: dict[Hashable, Any] = {
+    f"section{i}": {f"field{j}": {"value": j, "unit": "ms"} for j in range(20)} for i in range(200)
+}
+WIDE_INCLUDE = ["section7.*.value"]
+
+
+# 100k плоских ключей: 1000 пользователей по 100 полей на 3-4 уровнях
+FLAT_100K: dict[str, Any] = {
+    f"users.{i}.{group}.{field}.{leaf}": i
+    for i in range(1000)
+    for group in ("profile", "settings")
+    for field in range(10)
+    for leaf in ("value", "unit", "source", "updated", "flag")
+}
+
+
+def split_unflatten(flat: Mapping[str, Any], sep: str = ".") -> dict[str, Any]:
+    """Наивное обратное преобразование: разбор каждого ключа и спуск по всем сегментам от корня (без списков)."""
+    root: dict[str, Any] = {}
+    for key, value in flat.items():
+        *path, last = key.split(sep)
+        node = root
+        for segment in path:
+            node = node.setdefault(segment, {})
+        node[last] = value
+    return root
+
+
+def recursive_flat_dict(nested_dict: NestedMapping, *, sep: str = ".", _parent_key: str = "") -> dict[str, Any]:
+    """Исходная рекурсивная реализация `get_flat_dict_from_nested_mapping` - точка отсчёта."""
+    items = {}
+
+    for key, value in nested_dict.items() if isinstance(nested_dict, Mapping) else enumerate(nested_dict):
+        new_key = f"{_parent_key}{sep}{key}" if _parent_key else str(key)
+        if isinstance(value, (Mapping, list, tuple, set)):
+            items.update(recursive_flat_dict(value, sep=sep, _parent_key=new_key))
+        else:
+            items[new_key] = value
+
+    return items
+
+
+def bench(func: Callable[[], Any], number: int = 100_000, repeat: int = 5) -> float:
+    """Лучшее время одного вызова в микросекундах."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    compiled = compile_flattener(REAL_DATA)
+    assert compiled(REAL_DATA) == recursive_flat_dict(REAL_DATA) == get_flat_dict_from_nested_mapping(REAL_DATA)
+
+    baseline = bench(lambda: recursive_flat_dict(REAL_DATA))
+    results = {
+        "recursive (original)": baseline,
+        "iterative engine": bench(lambda: get_flat_dict_from_nested_mapping(REAL_DATA)),
+        "compiled": bench(lambda: compiled(REAL_DATA)),
+        "compiled, fallback": bench(lambda: compiled({**REAL_DATA, "extra": 1})),
+    }
+    for name, usec in results.items():
+        print(f"{name:<22} {usec:8.3f} us/call  x{baseline / usec:.2f}")
+
+    def post_filter() -> dict[str, Any]:
+        flat = get_flat_dict_from_nested_mapping(WIDE_DATA)
+        return {key: value for key, value in flat.items() if key.startswith("section7.") and key.endswith(".value")}
+
+    assert post_filter() == get_flat_dict_from_nested_mapping(WIDE_DATA, include=WIDE_INCLUDE)
+    baseline = bench(post_filter, number=100)
+    results = {
+        "filter after flatten": baseline,
+        "include pushdown": bench(
+            lambda: get_flat_dict_from_nested_mapping(WIDE_DATA, include=WIDE_INCLUDE), number=100
+        ),
+    }
+    for name, usec in results.items():
+        print(f"{name:<22} {usec:8.1f} us/call  x{baseline / usec:.2f}")
+
+    assert split_unflatten(FLAT_100K) == unflatten(FLAT_100K, lists=False)
+    baseline = bench(lambda: split_unflatten(FLAT_100K), number=3)
+    results = {
+        "split every key": baseline,
+        "prefix index": bench(lambda: unflatten(FLAT_100K, lists=False), number=3),
+        "prefix index, lists": bench(lambda: unflatten(FLAT_100K), number=3),
+    }
+    for name, usec in results.items():
+        print(f"{name:<22} {len(FLAT_100K) / usec:8.2f} M keys/s  x{baseline / usec:.2f}")
+
+
+if __name__ == "__main__":
+    main()
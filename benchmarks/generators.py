@@ -0,0 +1,52 @@
+"""Синтетические данные для замеров: одинаковые между запусками (фиксированный seed)."""
+
+import random
+from typing import Any, Hashable, Iterator
+
+
+def wide_document(sections: int = 200, fields: int = 20) -> dict[Hashable, Any]:
+    """Широкий неглубокий документ: `sections` разделов по `fields` полей."""
+    return {f"section{i}": {f"field{j}": {"value": j, "unit": "ms"} for j in range(fields)} for i in range(sections)}
+
+
+def deep_document(depth: int = 200, width: int = 2) -> dict[Hashable, Any]:
+    """Глубокий документ: цепочка из `depth` уровней, на каждом `width` листьев и ссылка дальше."""
+    doc: dict[Hashable, Any] = {"leaf": depth}
+    for level in range(depth - 1, -1, -1):
+        doc = {**{f"leaf{i}": level for i in range(width)}, "next": doc}
+    return doc
+
+
+def list_heavy_document(items: int = 1000, seed: int = 0) -> dict[Hashable, Any]:
+    """Документ, где основной объём - списки записей со вложенными списками."""
+    rnd = random.Random(seed)
+    return {
+        "items": [
+            {
+                "id": i,
+                "tags": [f"tag{rnd.randrange(50)}" for _ in range(5)],
+                "prices": [round(rnd.uniform(1, 100), 2) for _ in range(3)],
+                "owner": {"name": f"user{rnd.randrange(1000)}", "active": rnd.random() < 0.5},
+            }
+            for i in range(items)
+        ]
+    }
+
+
+def records(count: int = 1000, seed: int = 0) -> list[dict[Hashable, Any]]:
+    """Однотипные записи одной формы (как строки из API)."""
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "name": f"user{i}",
+            "address": {"city": rnd.choice(("Moscow", "Berlin", "Paris")), "zip": rnd.randrange(10**5)},
+            "scores": [rnd.random() for _ in range(3)],
+        }
+        for i in range(count)
+    ]
+
+
+def large_iterable(size: int = 1_000_000) -> Iterator[int]:
+    """Ленивая последовательность, которую нельзя нарезать срезами."""
+    return iter(range(size))
@@ -0,0 +1,104 @@
+"""Замер с прогревом и повторами, сохранение результатов и сравнение с базовой линией."""
+
+import fnmatch
+import json
+import platform
+import statistics
+import timeit
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+Setup = Callable[[], Callable[[], object]]
+
+# имя -> функция подготовки данных, возвращающая замеряемый вызов
+BENCHMARKS: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Регистрирует замер; подготовка данных выполняется один раз и не входит во время."""
+
+    def register(setup: Setup) -> Setup:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {name!r} is already registered")
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    """Время одного вызова в секундах: медиана и квартили по повторам."""
+
+    median: float
+    q1: float
+    q3: float
+    number: int
+    repeat: int
+
+    @property
+    def iqr(self) -> float:
+        return self.q3 - self.q1
+
+
+def measure(func: Callable[[], object], *, warmup: int = 1, repeat: int = 7, min_time: float = 0.05) -> Measurement:
+    """
+    Замер вызова.
+
+    Число вызовов в повторе подбирается так, чтобы повтор длился не меньше `min_time`,
+    затем `warmup` повторов отбрасываются, а по `repeat` оставшимся считаются медиана и квартили.
+    """
+    if repeat < 2:
+        raise ValueError("repeat must be at least two")
+    timer = timeit.Timer(func)
+    number = 1
+    while (elapsed := timer.timeit(number)) < min_time:
+        number = max(number * 2, int(number * min_time / elapsed) + 1) if elapsed else number * 10
+    for _ in range(warmup):
+        timer.timeit(number)
+    times = [timer.timeit(number) / number for _ in range(repeat)]
+    q1, median, q3 = statistics.quantiles(times, n=4, method="inclusive")
+    return Measurement(median, q1, q3, number, repeat)
+
+
+def run(pattern: str = "*", **kwargs: Any) -> dict[str, Measurement]:
+    """Выполняет зарегистрированные замеры, имена которых подходят под glob `pattern`."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if fnmatch.fnmatchcase(name, pattern):
+            results[name] = measure(setup(), **kwargs)
+    return results
+
+
+def dump(results: dict[str, Measurement], path: str) -> None:
+    meta = {"python": platform.python_version(), "implementation": platform.python_implementation()}
+    data = {"meta": meta, "results": {name: asdict(m) for name, m in results.items()}}
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+        file.write("\n")
+
+
+def load(path: str) -> dict[str, Measurement]:
+    with open(path) as file:
+        data = json.load(file)
+    return {name: Measurement(**m) for name, m in data["results"].items()}
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison:
+    name: str
+    baseline: Measurement
+    current: Measurement
+
+    @property
+    def ratio(self) -> float:
+        return self.current.median / self.baseline.median
+
+    def is_regression(self, threshold: float) -> bool:
+        """Медиана выросла больше чем на `threshold` и межквартильные интервалы не пересекаются (не шум)."""
+        return self.ratio > 1 + threshold and self.current.q1 > self.baseline.q3
+
+
+def compare(baseline: dict[str, Measurement], current: dict[str, Measurement]) -> list[Comparison]:
+    """Сравнение по замерам, которые есть в обоих наборах; замеры только из одного набора не попадают."""
+    return [Comparison(name, baseline[name], m) for name, m in current.items() if name in baseline]
@@ -0,0 +1,139 @@
+"""Замеры сниппетов: каждая функция готовит данные и возвращает замеряемый вызов."""
+
+import json
+from collections import deque
+from typing import Callable
+
+from benchmarks.generators import deep_document, large_iterable, list_heavy_document, records, wide_document
+from benchmarks.harness import benchmark
+from patterns.creational.builder import HouseDirector, StoneHouseConcreteBuilder
+from snippets.chunks import chunked, chunked_by_bytes, chunked_slices
+from snippets.decorators.fused_decorator import Limited, Retry, Timed, Traced, fused
+from snippets.decorators.limit_decorator import ConcurrencyLimiter, limited
+from snippets.decorators.retry_decorator import retry
+from snippets.decorators.timer_decorator import timeit_sync
+from snippets.decorators.tracing import traced
+from snippets.flat_from_nested import (
+    compile_flattener,
+    get_flat_columns_from_records,
+    get_flat_dict_from_nested_mapping,
+    iter_flat_items_from_json,
+    unflatten,
+)
+
+
+def _consume(make: Callable[[], object]) -> Callable[[], object]:
+    """Вызов, полностью вычитывающий ленивый результат `make()`."""
+    return lambda: deque(make(), maxlen=0)  # type: ignore[call-overload]
+
+
+@benchmark("chunks.chunked.list")
+def _() -> Callable[[], object]:
+    items = list(range(100_000))
+    return _consume(lambda: chunked(items, 100))
+
+
+@benchmark("chunks.chunked.iterator")
+def _() -> Callable[[], object]:
+    return _consume(lambda: chunked(large_iterable(100_000), 100))
+
+
+@benchmark("chunks.chunked_slices.bytes")
+def _() -> Callable[[], object]:
+    data = bytes(1_000_000)
+    return _consume(lambda: chunked_slices(data, 4096))
+
+
+@benchmark("chunks.chunked_by_bytes.strings")
+def _() -> Callable[[], object]:
+    items = [f"line {i}" for i in range(100_000)]
+    return _consume(lambda: chunked_by_bytes(items, 4096))
+
+
+@benchmark("flat.wide")
+def _() -> Callable[[], object]:
+    doc = wide_document()
+    return lambda: get_flat_dict_from_nested_mapping(doc)
+
+
+@benchmark("flat.wide.include")
+def _() -> Callable[[], object]:
+    doc = wide_document()
+    return lambda: get_flat_dict_from_nested_mapping(doc, include=["section7.*.value"])
+
+
+@benchmark("flat.deep")
+def _() -> Callable[[], object]:
+    doc = deep_document()
+    return lambda: get_flat_dict_from_nested_mapping(doc)
+
+
+@benchmark("flat.list_heavy")
+def _() -> Callable[[], object]:
+    doc = list_heavy_document()
+    return lambda: get_flat_dict_from_nested_mapping(doc)
+
+
+@benchmark("flat.compiled.records")
+def _() -> Callable[[], object]:
+    rows = records()
+    flatten = compile_flattener(rows[0])
+    return lambda: [flatten(row) for row in rows]
+
+
+@benchmark("flat.columns.records")
+def _() -> Callable[[], object]:
+    rows = records()
+    return lambda: get_flat_columns_from_records(rows)
+
+
+@benchmark("flat.unflatten.list_heavy")
+def _() -> Callable[[], object]:
+    flat = get_flat_dict_from_nested_mapping(list_heavy_document())
+    return lambda: unflatten(flat)
+
+
+@benchmark("flat.json_stream.list_heavy")
+def _() -> Callable[[], object]:
+    data = json.dumps(list_heavy_document()).encode()
+    return _consume(lambda: iter_flat_items_from_json(data))
+
+
+@benchmark("decorators.retry.overhead")
+def _() -> Callable[[], object]:
+    return retry(count=3)(lambda: None)
+
+
+@benchmark("decorators.timeit_sync.overhead")
+def _() -> Callable[[], object]:
+    return timeit_sync(lambda: None)
+
+
+@benchmark("decorators.traced.overhead")
+def _() -> Callable[[], object]:
+    return traced(lambda: None)
+
+
+@benchmark("decorators.stack.nested")
+def _() -> Callable[[], object]:
+    return retry(count=3)(timeit_sync(traced(limited(ConcurrencyLimiter(1))(lambda: None))))
+
+
+@benchmark("decorators.stack.fused")
+def _() -> Callable[[], object]:
+    return fused(Retry(count=3), Timed(), Traced(), Limited(ConcurrencyLimiter(1)))(lambda: None)
+
+
+@benchmark("decorators.stack.retry3.nested")
+def _() -> Callable[[], object]:
+    return retry(count=3)(retry(count=3)(retry(count=3)(lambda: None)))
+
+
+@benchmark("decorators.stack.retry3.fused")
+def _() -> Callable[[], object]:
+    return fused(Retry(count=3), Retry(count=3), Retry(count=3))(lambda: None)
+
+
+@benchmark("patterns.builder.director")
+def _() -> Callable[[], object]:
+    return lambda: HouseDirector(StoneHouseConcreteBuilder()).build_full_house()
@@ -0,0 +1,189 @@
+"""Generic functions in python with multiple-dispatching"""
+
+import inspect
+import itertools
+import types
+from abc import get_cache_token
+from functools import update_wrapper
+from typing import Any, Callable, Generic, ParamSpec, TypeVar, Union, get_args, get_origin, get_type_hints
+
+from examples.dispatch import Biba, Boba, Buba
+
+F_Spec = ParamSpec("F_Spec")
+F_Return = TypeVar("F_Return")
+
+Signature = tuple[type, ...]
+
+
+def _mro_distance(cls: type, base: type) -> float:
+    """
+    Насколько `base` далёк от `cls`: позиция в MRO.
+
+    ABC, от которых `cls` не наследуется явно (`register`, `__subclasshook__`), ставятся сразу после
+    самого дальнего класса MRO, который им соответствует - как это делает `singledispatch`.
+    """
+    mro = cls.__mro__
+    if base in mro:
+        return mro.index(base)
+    return max(i for i, klass in enumerate(mro) if issubclass(klass, base)) + 0.5
+
+
+def _expand(annotation: Any) -> tuple[type, ...]:
+    """Классы аннотации; `int | str` и `Union[int, str]` - несколько классов."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        return get_args(annotation)
+    if not isinstance(annotation, type):
+        raise TypeError(f"Invalid annotation for dispatch: {annotation!r}")
+    return (annotation,)
+
+
+class MultiDispatch(Generic[F_Spec, F_Return]):
+    """
+    Функция, реализация которой выбирается по классам нескольких первых позиционных аргументов.
+
+    Подходят реализации, у которых каждый класс - базовый для класса соответствующего аргумента. Из них
+    отбрасываются те, что менее специфичны другой подходящей по всем позициям; если остались несколько,
+    выбирается реализация с наименьшей суммарной MRO-дистанцией, а при равенстве - `TypeError` о неоднозначности.
+    Если не подходит ни одна - вызывается исходная функция.
+
+    Результат выбора кэшируется по кортежу классов, так что повторный вызов с теми же классами - одно обращение
+    к словарю. Кэш сбрасывается при регистрации, а если среди классов есть ABC - и при регистрации
+    в любом ABC (по `abc.get_cache_token`), потому что она меняет результат `issubclass`.
+    """
+
+    def __init__(self, func: Callable[F_Spec, F_Return]) -> None:
+        self._default = func
+        self._registry: dict[Signature, Callable[..., F_Return]] = {}
+        self._cache: dict[Signature, Callable[..., F_Return]] = {}
+        self._cache_token: object = None
+        self._nargs: int | None = None
+        update_wrapper(self, func)
+
+    @property
+    def registry(self) -> dict[Signature, Callable[..., F_Return]]:
+        return dict(self._registry)
+
+    def register(self, *classes: Any) -> Callable[[Callable[..., F_Return]], Callable[..., F_Return]]:
+        """
+        Регистрирует реализацию для классов аргументов: `@func.register(Biba, float)`.
+
+        Без классов (`@func.register()`) классы берутся из аннотаций первых позиционных параметров реализации.
+        Объединение (`int | str`) регистрирует реализацию для каждого из классов.
+        """
+
+        def decorator(impl: Callable[..., F_Return]) -> Callable[..., F_Return]:
+            annotations = classes or self._annotations(impl)
+            for signature in itertools.product(*map(_expand, annotations)):
+                self._add(signature, impl)
+            return impl
+
+        return decorator
+
+    def _annotations(self, impl: Callable[..., Any]) -> tuple[Any, ...]:
+        hints = get_type_hints(impl)
+        annotations = []
+        for param in inspect.signature(impl).parameters.values():
+            if param.kind not in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD) or param.name not in hints:
+                break
+            annotations.append(hints[param.name])
+        if not annotations:
+            raise TypeError(f"Expected annotated positional parameters in {impl.__qualname__}")
+        return tuple(annotations[: self._nargs])
+
+    def _add(self, signature: Signature, impl: Callable[..., F_Return]) -> None:
+        if self._nargs is None:
+            self._nargs = len(signature)
+        elif len(signature) != self._nargs:
+            raise TypeError(f"Expected {self._nargs} classes to dispatch on, got {len(signature)}")
+        self._registry[signature] = impl
+        if self._cache_token is None and any(hasattr(cls, "__abstractmethods__") for cls in signature):
+            self._cache_token = get_cache_token()
+        self._cache.clear()
+
+    def dispatch(self, *classes: type) -> Callable[..., F_Return]:
+        """Реализация для аргументов указанных классов."""
+        if self._cache_token is not None and self._cache_token != (token := get_cache_token()):
+            self._cache.clear()
+            self._cache_token = token
+        try:
+            return self._cache[classes]
+        except KeyError:
+            impl = self._cache[classes] = self._resolve(classes)
+            return impl
+
+    def _resolve(self, classes: Signature) -> Callable[..., F_Return]:
+        candidates = [
+            signature
+            for signature in self._registry
+            if len(signature) == len(classes) and all(map(issubclass, classes, signature))
+        ]
+        # менее специфичная по всем позициям реализация никогда не выбирается
+        best = [
+            signature
+            for signature in candidates
+            if not any(other != signature and all(map(issubclass, other, signature)) for other in candidates)
+        ]
+        if not best:
+            return self._default
+        distances = {signature: sum(map(_mro_distance, classes, signature)) for signature in best}
+        shortest = min(distances.values())
+        if len(winners := [signature for signature, d in distances.items() if d == shortest]) > 1:
+            names = ", ".join(f"({', '.join(cls.__name__ for cls in signature)})" for signature in winners)
+            raise TypeError(f"Ambiguous dispatch for {self._default.__qualname__}: {names}")
+        return self._registry[winners[0]]
+
+    def __call__(self, *args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return:
+        if self._nargs is None or len(args) < self._nargs:
+            return self._default(*args, **kwargs)
+        return self.dispatch(*[arg.__class__ for arg in args[: self._nargs]])(*args, **kwargs)
+
+
+def multidispatch(func: Callable[F_Spec, F_Return]) -> MultiDispatch[F_Spec, F_Return]:
+    """Декоратор: исходная функция - реализация по умолчанию, остальные добавляются через `register`."""
+    return MultiDispatch(func)
+
+
+@multidispatch
+def pay_salary(employee: Biba | Boba | Buba, money: float | str | list[float]) -> None:
+    raise NotImplementedError(f"Unsupported types: {type(employee)}, {type(money)}")
+
+
+@pay_salary.register()
+def pay_biba(biba: Biba, money: int | float) -> None:
+    biba.salary = biba.salary + money
+
+
+@pay_salary.register()
+def pay_biba_str(biba: Biba, money: str) -> None:
+    biba.salary = biba.salary + float(money)
+
+
+@pay_salary.register()
+def pay_boba(boba: Boba, money: object) -> None:
+    boba.salary = f"{boba.salary}${money}"
+
+
+@pay_salary.register()
+def pay_buba(buba: Buba, money: list) -> None:  # type: ignore[type-arg]
+    buba.salary.extend(money)
+
+
+@pay_salary.register()
+def pay_buba_one(buba: Buba, money: int | float) -> None:
+    buba.salary.append(money)
+
+
+if __name__ == "__main__":
+    biba = Biba(0)
+    boba = Boba("0")
+    buba = Buba([])
+
+    pay_salary(biba, 10)
+    pay_salary(biba, "2.5")
+    pay_salary(boba, 10)
+    pay_salary(buba, [10])
+    pay_salary(buba, 5.0)
+
+    print(biba.salary)
+    print(boba.salary)
+    print(buba.salary)
@@ -1,28 +1,365 @@
-from collections.abc import Iterable
-from typing import TypeVar
+import asyncio
+import mmap
+import os
+from bisect import bisect_right
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Buffer, Callable, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Literal, TypeVar, overload
 
-from itertools import batched, islice
+from itertools import accumulate, batched, islice
 
 T = TypeVar("T")
+R = TypeVar("R")
+
+_TIMEOUT = object()
 
 
 def chunked(items: Iterable[T], size: int) -> Iterable[list[T]]:
     """Yield successive n-sized chunks from items (itertools.batched)."""
-    buffer = []
-    for item in items:
-        buffer.append(item)
-        if len(buffer) != size:
-            continue
-        yield buffer
-        buffer = []
+    if size < 1:
+        raise ValueError("size must be at least one")
+
+    if isinstance(items, list):
+        # срез списка копирует ссылки одним вызовом, без поэлементного append
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+        return
+
+    # кусок собирается на стороне C (islice + list), без поэлементного append в цикле Python
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+@overload
+def chunked_slices(items: Buffer, size: int) -> Iterator[memoryview]: ...
+
+
+@overload
+def chunked_slices(items: Iterable[T], size: int) -> Iterator[Sequence[T]]: ...
+
+
+def chunked_slices(items: Iterable[T] | Buffer, size: int) -> Iterator[Sequence[T] | memoryview]:
+    """
+    Нарезает данные на куски по `size` элементов без поэлементного копирования.
+
+    bytes, bytearray, array.array и другие объекты с buffer protocol режутся на срезы `memoryview`
+    (zero-copy, куски ссылаются на исходный буфер), последовательности - на срезы того же типа,
+    остальные итерируемые - как в `chunked`.
+    """
+    if size < 1:
+        raise ValueError("size must be at least one")
+
+    if isinstance(items, Buffer):
+        view = memoryview(items)
+        for start in range(0, len(view), size):
+            yield view[start : start + size]
+    elif isinstance(items, Sequence):
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+    else:
+        yield from chunked(items, size)
+
+
+@overload
+def chunked_by_bytes(items: Buffer, max_bytes: int, *, size_of: Callable[[Any], int] = len) -> Iterator[memoryview]: ...
+
+
+@overload
+def chunked_by_bytes(
+    items: Iterable[T], max_bytes: int, *, size_of: Callable[[Any], int] = len
+) -> Iterator[Sequence[T]]: ...
+
+
+def chunked_by_bytes(
+    items: Iterable[T] | Buffer, max_bytes: int, *, size_of: Callable[[Any], int] = len
+) -> Iterator[Sequence[T] | memoryview]:
+    """
+    Нарезает данные на куски, суммарный размер которых не превышает `max_bytes`.
+
+    Буфер режется на срезы `memoryview` не больше `max_bytes` байт (по целым элементам).
+    Для последовательности элементов (например, списка payload-ов) размеры считаются `size_of`,
+    а границы кусков ищутся бинарным поиском по накопленным суммам - на каждый кусок один срез.
+    Элемент больше `max_bytes` попадает в кусок один.
+
+    :param items: Буфер или элементы.
+    :param max_bytes: Бюджет размера куска.
+    :param size_of: Размер элемента в байтах. По умолчанию: `len`.
+    """
+    if max_bytes < 1:
+        raise ValueError("max_bytes must be at least one")
+
+    if isinstance(items, Buffer):
+        view = memoryview(items)
+        # для многомерного буфера срез идёт по первому измерению - считаем размер его элемента
+        row_bytes = view.nbytes // len(view) if len(view) else 1
+        yield from chunked_slices(view, max(1, max_bytes // row_bytes))
+        return
+
+    if not isinstance(items, Sequence):
+        buffer: list[T] = []
+        total = 0
+        for item in items:
+            item_size = size_of(item)
+            if buffer and total + item_size > max_bytes:
+                yield buffer
+                buffer, total = [], 0
+            buffer.append(item)
+            total += item_size
+        if buffer:
+            yield buffer
+        return
+
+    # ends[i] - суммарный размер items[:i + 1]
+    ends = list(accumulate(map(size_of, items)))
+    start, consumed = 0, 0
+    while start < len(ends):
+        end = max(bisect_right(ends, consumed + max_bytes, lo=start), start + 1)
+        yield items[start:end]
+        start, consumed = end, ends[end - 1]
+
+
+def parallel_map_chunks(
+    func: Callable[[list[T]], R],
+    items: Iterable[T],
+    size: int,
+    *,
+    executor: Literal["thread", "process"] | Executor = "thread",
+    max_workers: int | None = None,
+    max_in_flight: int | None = None,
+    ordered: bool = True,
+) -> Iterator[R]:
+    """
+    Применяет `func` к кускам `chunked(items, size)` в пуле потоков или процессов и отдаёт результаты по кускам.
+
+    Одновременно в работе не больше `max_in_flight` кусков: следующий кусок читается из `items` только после
+    того, как освободилось место, поэтому память ограничена и для бесконечных итераторов.
+    Исключение из `func` пробрасывается вызывающему при получении соответствующего результата,
+    невыполненные куски при этом (и при досрочном закрытии генератора) отменяются.
+
+    :param func: Функция над куском; для `"process"` должна сериализоваться pickle.
+    :param items: Элементы (в том числе бесконечный итератор).
+    :param size: Размер куска.
+    :param executor: `"thread"`, `"process"` или готовый `Executor` (его не закрываем).
+    :param max_workers: Число воркеров создаваемого пула.
+    :param max_in_flight: Максимум кусков в работе. По умолчанию: 2 * число воркеров.
+    :param ordered: Отдавать результаты в порядке кусков (иначе - по мере готовности).
+    """
+    if max_in_flight is None:
+        max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least one")
+
+    if isinstance(executor, Executor):
+        pool, own_pool = executor, False
+    elif executor == "thread":
+        pool, own_pool = ThreadPoolExecutor(max_workers), True
+    elif executor == "process":
+        pool, own_pool = ProcessPoolExecutor(max_workers), True
+    else:
+        raise ValueError(f"Unknown executor: {executor!r}")
+
+    in_flight: deque[Future[R]] = deque()
+    try:
+        for chunk in chunked(items, size):
+            in_flight.append(pool.submit(func, chunk))
+            if len(in_flight) < max_in_flight:
+                continue
+            if ordered:
+                yield in_flight.popleft().result()
+            else:
+                yield from _pop_completed(in_flight)
+        while in_flight:
+            if ordered:
+                yield in_flight.popleft().result()
+            else:
+                yield from _pop_completed(in_flight)
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if own_pool:
+            pool.shutdown(cancel_futures=True)
+
+
+def _pop_completed(in_flight: deque[Future[R]]) -> Iterator[R]:
+    """Дожидается хотя бы одного готового куска и отдаёт результаты всех готовых, убирая их из очереди."""
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    for future in [future for future in in_flight if future in done]:
+        in_flight.remove(future)
+        yield future.result()
+
+
+def get_file_ranges(path: str | os.PathLike[str], parts: int, *, delimiter: bytes = b"\n") -> list[tuple[int, int]]:
+    """
+    Делит файл на `parts` диапазонов байт `[start, end)`, границы которых выровнены по концу записи.
+
+    Граница ищется через `mmap` от примерной позиции `size * i / parts` до ближайшего `delimiter`,
+    так что читаются только байты около границ. Пустые диапазоны отбрасываются.
+    """
+    if parts < 1:
+        raise ValueError("parts must be at least one")
+
+    file_size = os.path.getsize(path)
+    if not file_size:
+        return []
+
+    ranges = []
+    start = 0
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for part in range(1, parts + 1):
+            if start >= file_size:
+                break
+            if part == parts:
+                end = file_size
+            else:
+                found = mm.find(delimiter, max(start, file_size * part // parts))
+                end = file_size if found == -1 else found + len(delimiter)
+            if end > start:
+                ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def iter_file_range(path: str | os.PathLike[str], start: int, end: int, *, delimiter: bytes = b"\n") -> Iterator[bytes]:
+    """Записи файла из диапазона `[start, end)` вместе с `delimiter`, как при итерации по `open(path, "rb")`."""
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        if delimiter == b"\n":
+            # построчное чтение mmap на стороне C; `end` выровнен по концу строки
+            mm.seek(start)
+            for line in iter(mm.readline, b""):
+                yield line
+                pos += len(line)
+                if pos >= end:
+                    return
+            return
+
+        while pos < end:
+            found = mm.find(delimiter, pos, end)
+            next_pos = end if found == -1 else found + len(delimiter)
+            yield mm[pos:next_pos]
+            pos = next_pos
+
+
+def _map_file_ranges(
+    func: Callable[[list[bytes]], R],
+    path: str | os.PathLike[str],
+    size: int,
+    delimiter: bytes,
+    ranges: list[tuple[int, int]],
+) -> list[R]:
+    return [
+        func(chunk)
+        for start, end in ranges
+        for chunk in chunked(iter_file_range(path, start, end, delimiter=delimiter), size)
+    ]
+
+
+def parallel_map_file_chunks(
+    func: Callable[[list[bytes]], R],
+    path: str | os.PathLike[str],
+    size: int,
+    *,
+    processes: int | None = None,
+    delimiter: bytes = b"\n",
+    range_bytes: int = 16 * 2**20,
+    max_in_flight: int | None = None,
+) -> Iterator[R]:
+    """
+    Параллельный аналог `map(func, chunked(open(path, "rb"), size))` для больших файлов с записями-строками.
+
+    Файл делится `get_file_ranges` на диапазоны примерно по `range_bytes` (но не меньше одного на процесс);
+    процесс сам читает диапазон через `mmap` (каждый байт читается один раз, записи не передаются между
+    процессами) и применяет `func` к кускам по `size` записей. Диапазоны раздаются через `parallel_map_chunks`,
+    поэтому в работе не больше `max_in_flight` диапазонов, а результаты отдаются в порядке файла по мере
+    готовности диапазонов: память ограничена и для файлов любого размера.
+    Куски не пересекают границы диапазонов, поэтому последний кусок диапазона может быть неполным.
+
+    :param func: Функция над куском записей, должна сериализоваться pickle.
+    :param path: Путь к файлу.
+    :param size: Число записей в куске.
+    :param processes: Число процессов. По умолчанию: `os.cpu_count()`.
+    :param delimiter: Разделитель записей.
+    :param range_bytes: Примерный размер диапазона, который обрабатывает процесс за одну задачу.
+    :param max_in_flight: Максимум диапазонов в работе. По умолчанию: 2 * число процессов.
+    """
+    if range_bytes < 1:
+        raise ValueError("range_bytes must be at least one")
+    processes = processes or os.cpu_count() or 1
+    parts = max(processes, -(-os.path.getsize(path) // range_bytes))
+    ranges = get_file_ranges(path, parts, delimiter=delimiter)
+    if not ranges:
+        return
+
+    map_ranges = partial(_map_file_ranges, func, path, size, delimiter)
+    for results in parallel_map_chunks(
+        map_ranges, ranges, 1, executor="process", max_workers=min(processes, len(ranges)), max_in_flight=max_in_flight
+    ):
+        yield from results
+
+
+async def achunked(items: AsyncIterable[T], size: int, max_wait: float | None = None) -> AsyncIterator[list[T]]:
+    """
+    Асинхронный `chunked`: отдаёт кусок, когда набралось `size` элементов или прошло `max_wait` секунд
+    с момента, когда в пустой кусок попал первый элемент, - что наступит раньше.
+
+    Чтение следующего элемента не отменяется по таймауту, а продолжается в фоне, поэтому элементы не теряются.
+    Неполный кусок отдаётся в конце потока и перед пробросом ошибки источника. При отмене ожидающего куска
+    (в том числе по `asyncio.timeout`) `CancelledError` пробрасывается сразу, а накопленный кусок отбрасывается.
+
+    :param items: Асинхронный источник элементов.
+    :param size: Максимальный размер куска.
+    :param max_wait: Максимальное ожидание куска после первого элемента в секундах. По умолчанию: без ограничения.
+    """
+    if size < 1:
+        raise ValueError("size must be at least one")
+
+    loop = asyncio.get_running_loop()
+    iterator = aiter(items)
+    buffer: list[T] = []
+    deadline = 0.0
+    next_item: asyncio.Future[T] | None = None
+    try:
+        while True:
+            if next_item is None:
+                next_item = asyncio.ensure_future(anext(iterator))
+            timeout = None if max_wait is None or not buffer else max(0.0, deadline - loop.time())
+            try:
+                done, _ = await asyncio.wait((next_item,), timeout=timeout)
+                if done:
+                    item: Any = next_item.result()
+                    next_item = None
+                else:
+                    item = _TIMEOUT
+            except StopAsyncIteration:
+                next_item = None
+                break
+            except Exception:
+                # ошибка источника (не отмена: `CancelledError` проходит мимо, ничего не отдавая)
+                next_item = None
+                if buffer:
+                    yield buffer
+                raise
+
+            if item is _TIMEOUT:
+                yield buffer
+                buffer = []
+                continue
+            if not buffer and max_wait is not None:
+                deadline = loop.time() + max_wait
+            buffer.append(item)
+            if len(buffer) >= size:
+                yield buffer
+                buffer = []
+    finally:
+        if next_item is not None:
+            next_item.cancel()
+
     if buffer:
         yield buffer
 
-    # second vers
-    # it = iter(items)
-    # while chunk := tuple(islice(it, size)):
-    #     yield chunk
-
 
 if __name__ == "__main__":
     assert list(chunked([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
@@ -30,3 +367,18 @@ if __name__ == "__main__":
     assert list(chunked([1], 2)) == [[1]]
 
     assert list(batched([1, 2, 3, 4, 5], 2)) == [(1, 2), (3, 4), (5,)]
+
+    assert [bytes(chunk) for chunk in chunked_slices(b"abcde", 2)] == [b"ab", b"cd", b"e"]
+    assert list(chunked_by_bytes([b"ab", b"cde", b"f", b"ghijk"], 4)) == [[b"ab"], [b"cde", b"f"], [b"ghijk"]]
+
+    assert list(parallel_map_chunks(sum, range(10), 3)) == [3, 12, 21, 9]
+
+    async def _ticks() -> AsyncIterator[int]:
+        for i in range(5):
+            await asyncio.sleep(0.1 if i == 4 else 0)
+            yield i
+
+    async def _batches() -> list[list[int]]:
+        return [batch async for batch in achunked(_ticks(), 3, max_wait=0.05)]
+
+    assert asyncio.run(_batches()) == [[0, 1, 2], [3], [4]]
@@ -1,14 +1,18 @@
 import asyncio
 from contextlib import asynccontextmanager, AsyncExitStack
 from types import TracebackType
-from typing import Literal, Self, Type, AsyncGenerator
+from typing import Literal, Self, Type, AsyncGenerator, get_args
+
+from snippets.context_managers.concurrent_exit_stack import ConcurrentExitStack
 
 BROWSER_NAME = Literal["Safari", "Chrome", "Brave"]
+BROWSER_NAMES: tuple[BROWSER_NAME, ...] = get_args(BROWSER_NAME)
 
 
 class Browser:
     def __init__(self, name: BROWSER_NAME) -> None:
         self.name = name
+        self.closed = False
 
     async def find(self, query: str) -> str:
         await asyncio.sleep(1.5)
@@ -22,15 +26,18 @@ class Browser:
         self, exc_type: Type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
     ) -> None:
         print(f"After async context manager (magic method): closing browser: {self.name}")
+        self.closed = True
 
 
 @asynccontextmanager
 async def get_browser(browser_name: BROWSER_NAME) -> AsyncGenerator[Browser, None]:
     print(f"Before async context manager (contextlib): opening browser {browser_name}")
+    browser = Browser(browser_name)
     try:
-        yield Browser(browser_name)
+        yield browser
     finally:
         print(f"After async context manager (contextlib): closing browser: {browser_name}")
+        browser.closed = True
 
 
 async def main():
@@ -48,6 +55,11 @@ async def main():
             browser = await stack.enter_async_context(get_browser(name))
             print(await browser.find("42"))
 
+    # то же, но браузеры открываются, ищут и закрываются параллельно
+    async with ConcurrentExitStack() as concurrent_stack:
+        browsers = await concurrent_stack.enter_all(map(get_browser, BROWSER_NAMES))
+        print(*await asyncio.gather(*(browser.find("42") for browser in browsers)), sep="\n")
+
 
 if __name__ == "__main__":
     asyncio.run(main())
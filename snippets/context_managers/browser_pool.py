@@ -0,0 +1,257 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, suppress
+from dataclasses import dataclass
+from types import TracebackType
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Self, Type
+
+from snippets.context_managers.async_browser_context_manager import BROWSER_NAME, Browser
+
+BrowserFactory = Callable[[], AbstractAsyncContextManager[Browser]]
+HealthCheck = Callable[[Browser], Awaitable[bool]]
+
+
+async def is_open(browser: Browser) -> bool:
+    return not browser.closed
+
+
+@dataclass(slots=True)
+class _PooledBrowser:
+    manager: AbstractAsyncContextManager[Browser]
+    browser: Browser
+    released_at: float
+
+
+class BrowserPool:
+    """
+    Пул открытых браузеров: запуск браузера дорогой, поэтому браузеры переиспользуются между запросами.
+
+    Браузер открывается контекстным менеджером из `factory` (по умолчанию `Browser(name)`) и закрывается
+    его `__aexit__` при вытеснении или закрытии пула.
+
+    :param min_size: Сколько браузеров держать открытыми всегда (открываются в `start`).
+    :param max_size: Максимум открытых браузеров; остальные `acquire` ждут освобождения.
+    :param acquire_timeout: Сколько ждать браузер в `acquire` (включая запуск нового), `None` - без ограничения.
+    :param max_idle_sec: Через сколько простоя закрывать браузеры сверх `min_size`, `None` - не закрывать.
+    :param health_check: Проверка браузера из пула перед выдачей; неисправный закрывается и заменяется.
+    """
+
+    def __init__(
+        self,
+        name: BROWSER_NAME = "Chrome",
+        *,
+        min_size: int = 0,
+        max_size: int = 4,
+        acquire_timeout: float | None = None,
+        max_idle_sec: float | None = 60.0,
+        health_check: HealthCheck | None = is_open,
+        factory: BrowserFactory | None = None,
+    ) -> None:
+        if max_size < 1 or not 0 <= min_size <= max_size:
+            raise ValueError("expected 0 <= min_size <= max_size and max_size >= 1")
+        self._factory: BrowserFactory = factory or (lambda: Browser(name))
+        self._min_size = min_size
+        self._max_size = max_size
+        self._acquire_timeout = acquire_timeout
+        self._max_idle_sec = max_idle_sec
+        self._health_check = health_check
+        self._idle: deque[_PooledBrowser] = deque()  # справа - недавно возвращённые
+        self._size = 0  # открытые и открывающиеся браузеры
+        self._in_use = 0
+        self._cond = asyncio.Condition()
+        self._closed = False
+        self._evictor: asyncio.Task[None] | None = None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    async def _open(self) -> _PooledBrowser:
+        manager = self._factory()
+        browser = await manager.__aenter__()
+        return _PooledBrowser(manager, browser, time.monotonic())
+
+    async def _close(self, pooled: _PooledBrowser) -> None:
+        """Закрывает браузер; ошибка закрытия не должна ломать пул, поэтому уходит в обработчик event loop."""
+        try:
+            await pooled.manager.__aexit__(None, None, None)
+        except Exception as e:
+            asyncio.get_running_loop().call_exception_handler(
+                {"message": "Error closing pooled browser", "exception": e}
+            )
+
+    async def start(self) -> None:
+        """
+        Открывает `min_size` браузеров параллельно и запускает вытеснение простаивающих.
+
+        Если какой-то браузер не открылся, уже открытые в этом вызове закрываются, а вытеснение не запускается:
+        `__aexit__` после неудачного `__aenter__` не вызывается, и убрать их было бы некому.
+        """
+        async with self._cond:
+            need = max(0, self._min_size - self._size)
+            self._size += need
+        results = await asyncio.gather(*(self._open() for _ in range(need)), return_exceptions=True)
+        opened = [r for r in results if not isinstance(r, BaseException)]
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            async with self._cond:
+                self._size -= need
+                self._cond.notify_all()
+            await asyncio.gather(*(self._close(pooled) for pooled in opened))
+            raise BaseExceptionGroup("Failed to open browsers", errors)
+        async with self._cond:
+            self._idle.extend(opened)
+            self._cond.notify_all()
+        if self._max_idle_sec is not None and self._evictor is None:
+            self._evictor = asyncio.create_task(self._evict_idle(self._max_idle_sec))
+
+    async def _evict_idle(self, max_idle_sec: float) -> None:
+        while True:
+            await asyncio.sleep(max_idle_sec / 2)
+            now = time.monotonic()
+            expired = []
+            async with self._cond:
+                while self._idle and self._size > self._min_size and now - self._idle[0].released_at >= max_idle_sec:
+                    expired.append(self._idle.popleft())
+                    self._size -= 1
+                self._cond.notify_all()
+            for pooled in expired:
+                await self._close(pooled)
+
+    async def _discard(self, pooled: _PooledBrowser | None) -> None:
+        async with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._cond.notify_all()
+        if pooled is not None:
+            await self._close(pooled)
+
+    async def _checkout(self) -> _PooledBrowser:
+        while True:
+            async with self._cond:
+                while not self._closed and not self._idle and self._size >= self._max_size:
+                    await self._cond.wait()
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    self._size += 1
+                self._in_use += 1
+
+            if pooled is None:
+                try:
+                    return await self._open()
+                except BaseException:
+                    await self._discard(None)
+                    raise
+
+            try:
+                healthy = self._health_check is None or await self._health_check(pooled.browser)
+            except Exception:
+                healthy = False
+            except BaseException:
+                await self._discard(pooled)
+                raise
+            if healthy:
+                return pooled
+            await self._discard(pooled)
+
+    async def _release(self, pooled: _PooledBrowser) -> None:
+        async with self._cond:
+            self._in_use -= 1
+            if not self._closed:
+                pooled.released_at = time.monotonic()
+                self._idle.append(pooled)
+                self._cond.notify_all()
+                return
+            self._size -= 1
+            self._cond.notify_all()
+        await self._close(pooled)
+
+    @asynccontextmanager
+    async def acquire(self, timeout: float | None = None) -> AsyncIterator[Browser]:
+        """
+        Браузер из пула на время блока `async with`.
+
+        :param timeout: Сколько ждать браузер; по умолчанию - `acquire_timeout` пула. По истечении - `TimeoutError`.
+        """
+        async with asyncio.timeout(self._acquire_timeout if timeout is None else timeout):
+            pooled = await self._checkout()
+        try:
+            yield pooled.browser
+        finally:
+            await self._release(pooled)
+
+    async def find(self, query: str) -> str:
+        async with self.acquire() as browser:
+            return await browser.find(query)
+
+    async def find_many(self, queries: Iterable[str], *, concurrency: int | None = None) -> list[str]:
+        """
+        Результаты `find` по всем запросам в порядке запросов.
+
+        Запросы выполняют `concurrency` (по умолчанию `max_size`) воркеров, поэтому одновременно выполняется
+        не больше `concurrency` поисков и задачи не создаются на каждый запрос. При ошибке остальные поиски отменяются.
+        """
+        queries = list(queries)
+        results = [""] * len(queries)
+        pending = iter(enumerate(queries))
+
+        async def worker() -> None:
+            for i, query in pending:
+                results[i] = await self.find(query)
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(min(concurrency or self._max_size, len(queries))):
+                tg.create_task(worker())
+        return results
+
+    async def close(self, timeout: float | None = None) -> None:
+        """
+        Плавное закрытие: новые `acquire` сразу получают `RuntimeError`, свободные браузеры закрываются,
+        занятые - по мере возврата; ждёт возврата всех браузеров не дольше `timeout`.
+        """
+        async with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        if self._evictor is not None:
+            self._evictor.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._evictor
+        await asyncio.gather(*(self._close(pooled) for pooled in idle))
+        async with asyncio.timeout(timeout):
+            async with self._cond:
+                await self._cond.wait_for(lambda: self._in_use == 0)
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self, exc_type: Type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        await self.close()
+
+
+async def main() -> None:
+    async with BrowserPool("Chrome", min_size=1, max_size=3) as pool:
+        started = time.perf_counter()
+        results = await pool.find_many([str(i) for i in range(6)])
+        print(*results, sep="\n")
+        print(f"6 queries on {pool.size} browsers took {time.perf_counter() - started:.2f} seconds")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
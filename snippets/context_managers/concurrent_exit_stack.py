@@ -0,0 +1,78 @@
+import asyncio
+from contextlib import AbstractAsyncContextManager
+from types import TracebackType
+from typing import Any, Iterable, Self, Type, TypeVar
+
+T = TypeVar("T")
+
+ExcInfo = tuple[Type[BaseException] | None, BaseException | None, TracebackType | None]
+
+
+async def _enter(manager: AbstractAsyncContextManager[T]) -> T:
+    return await manager.__aenter__()
+
+
+def _is_failed(task: asyncio.Task[Any]) -> bool:
+    return task.cancelled() or task.exception() is not None
+
+
+async def _exit_all(managers: list[AbstractAsyncContextManager[Any]], exc_info: ExcInfo) -> list[BaseException]:
+    """Параллельный `__aexit__` всех менеджеров; возвращает все ошибки выхода."""
+    results = await asyncio.gather(*(manager.__aexit__(*exc_info) for manager in managers), return_exceptions=True)
+    return [result for result in results if isinstance(result, BaseException)]
+
+
+class ConcurrentExitStack:
+    """
+    Аналог `AsyncExitStack`, который открывает и закрывает контекстные менеджеры параллельно.
+
+    Если какой-то менеджер не открылся, остальные ещё открывающиеся отменяются, а уже открытые закрываются;
+    исключения всех неудачных входов и выходов собираются в `BaseExceptionGroup`.
+    При выходе из стека все менеджеры закрываются одновременно и получают исключение блока `async with`;
+    подавление исключения из `__aexit__` не поддерживается - возвращаемое значение игнорируется.
+    """
+
+    def __init__(self) -> None:
+        self._entered: list[AbstractAsyncContextManager[Any]] = []
+
+    async def enter_all(self, managers: Iterable[AbstractAsyncContextManager[T]]) -> list[T]:
+        """Входит во все менеджеры параллельно и возвращает результаты `__aenter__` в порядке менеджеров."""
+        managers = list(managers)
+        tasks = [asyncio.create_task(_enter(manager)) for manager in managers]
+        interrupted: BaseException | None = None
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except BaseException as error:  # отмена самого вызова
+            interrupted = error
+        if interrupted is not None or any(task.done() and _is_failed(task) for task in tasks):
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        entered = [manager for manager, task in zip(managers, tasks) if not _is_failed(task)]
+        if interrupted is None and len(entered) == len(managers):
+            self._entered.extend(entered)
+            return [task.result() for task in tasks]
+        errors = [exc for task in tasks if not task.cancelled() and (exc := task.exception()) is not None]
+        errors += await _exit_all(entered, (None, None, None))
+        if interrupted is not None:
+            raise interrupted
+        if not errors:
+            raise asyncio.CancelledError
+        raise BaseExceptionGroup("Failed to enter async context managers", errors)
+
+    async def aclose(self) -> None:
+        await self._close((None, None, None))
+
+    async def _close(self, exc_info: ExcInfo) -> None:
+        entered, self._entered = self._entered, []
+        if errors := await _exit_all(entered, exc_info):
+            raise BaseExceptionGroup("Failed to exit async context managers", errors)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self, exc_type: Type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        await self._close((exc_type, exc_value, traceback))
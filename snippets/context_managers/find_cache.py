@@ -0,0 +1,54 @@
+import asyncio
+import time
+from typing import Protocol
+
+from snippets.context_managers.browser_pool import BrowserPool
+from snippets.decorators.cache_decorator import CacheStats, memoize
+
+
+class Finder(Protocol):
+    async def find(self, query: str) -> str: ...
+
+
+class CachedFinder:
+    """
+    Кэш результатов `find` (LRU + TTL) с объединением одинаковых одновременных запросов (single-flight).
+
+    Построен на `memoize`: промахи по одному запросу ждут один общий поиск. Отмена одного из ожидающих не отменяет
+    поиск для остальных; поиск отменяется, только когда отменены все ожидающие. Ошибки не кэшируются: их получают
+    все ожидающие, а следующий вызов ищет заново.
+
+    :param finder: Источник результатов - `Browser`, `BrowserPool` или любой объект с `async find(query)`.
+    :param maxsize: Максимум запросов в кэше, при переполнении вытесняются давно не использованные.
+    :param ttl_sec: Сколько секунд результат считается свежим.
+    """
+
+    def __init__(self, finder: Finder, *, maxsize: int = 1024, ttl_sec: float = 60.0) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least one")
+        self._find = memoize(maxsize, ttl_sec=ttl_sec)(finder.find)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._find.cache_info()
+
+    def clear(self) -> None:
+        """Очищает кэш; результаты уже идущих поисков в него не попадут."""
+        self._find.cache_clear()
+
+    async def find(self, query: str) -> str:
+        return await self._find(query)
+
+
+async def main() -> None:
+    async with BrowserPool("Chrome", max_size=2) as pool:
+        finder = CachedFinder(pool, ttl_sec=30)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(finder.find(query) for query in ["42", "42", "7", "42", "7"]))
+        print(*results, sep="\n")
+        print(await finder.find("42"))
+        print(f"{finder.stats} in {time.perf_counter() - started:.2f} seconds")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
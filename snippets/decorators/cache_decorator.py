@@ -0,0 +1,228 @@
+import asyncio
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Hashable, ParamSpec, Protocol, TypeVar, cast
+
+F_Spec = ParamSpec("F_Spec")
+F_Return = TypeVar("F_Return")
+F_Return_co = TypeVar("F_Return_co", covariant=True)
+
+_MISSING: Any = object()
+_KWARGS_MARK = object()
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    coalesced: int  # промахи корутин, дождавшиеся уже идущего вызова с теми же аргументами
+    evictions: int  # вытеснено по `maxsize` / `max_bytes` (истёкшие по TTL не считаются)
+    size: int
+    bytes: int
+
+
+class Memoized(Protocol[F_Spec, F_Return_co]):
+    def __call__(self, *args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return_co: ...
+
+    def cache_info(self) -> CacheStats: ...
+
+    def cache_clear(self) -> None: ...
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+
+
+class _Cache:
+    """LRU со сроком жизни записей и ограничением суммарного размера; потокобезопасен."""
+
+    def __init__(
+        self, maxsize: int | None, ttl_sec: float | None, max_bytes: int | None, size_of: Callable[[Any], int]
+    ) -> None:
+        self._maxsize = maxsize
+        self._ttl_sec = ttl_sec
+        self._max_bytes = max_bytes
+        self._size_of = size_of
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self._hits = self._misses = self._coalesced = self._evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._bytes -= self._entries.pop(key).size
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        """Сохраняет значение, если кэш не очищали после начала вычисления (`generation`)."""
+        size = self._size_of(value) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+        expires_at = time.monotonic() + self._ttl_sec if self._ttl_sec is not None else float("inf")
+        with self._lock:
+            if generation != self.generation:
+                return
+            if (old := self._entries.pop(key, None)) is not None:
+                self._bytes -= old.size
+            self._entries[key] = _Entry(value, expires_at, size)
+            self._bytes += size
+            while (self._maxsize is not None and len(self._entries) > self._maxsize) or (
+                self._max_bytes is not None and self._bytes > self._max_bytes
+            ):
+                self._bytes -= self._entries.popitem(last=False)[1].size
+                self._evictions += 1
+
+    def count_coalesced(self) -> None:
+        with self._lock:
+            self._coalesced += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.generation += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._coalesced, self._evictions, len(self._entries), self._bytes
+            )
+
+
+def _make_key(args: tuple[Any, ...], kwargs: dict[str, Any], typed: bool) -> Hashable:
+    """Ключ из аргументов вызова; порядок именованных аргументов не важен."""
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK, *sorted(kwargs.items()))
+    if typed:
+        key += tuple(type(arg) for arg in args) + tuple(type(value) for _, value in sorted(kwargs.items()))
+    return key
+
+
+@dataclass(slots=True)
+class _Flight:
+    task: asyncio.Task[Any]
+    waiters: int = 0
+
+
+def memoize(
+    maxsize: int | None = 128,
+    *,
+    ttl_sec: float | None = None,
+    max_bytes: int | None = None,
+    size_of: Callable[[Any], int] = sys.getsizeof,
+    typed: bool = False,
+) -> Callable[[Callable[F_Spec, F_Return]], Memoized[F_Spec, F_Return]]:
+    """
+    Декоратор для кэширования результатов синхронных и асинхронных функций.
+
+    Ключ строится из позиционных и именованных аргументов (они должны быть хэшируемыми), исключения не кэшируются.
+    Для корутинных функций одновременные вызовы с одинаковыми аргументами ждут одно общее выполнение;
+    отмена одного ожидающего не отменяет его для остальных.
+    Статистика - `func.cache_info()`, очистка - `func.cache_clear()`.
+
+    :param maxsize: Максимум записей, `None` - без ограничения.
+    :param ttl_sec: Сколько секунд запись считается свежей, `None` - бессрочно.
+    :param max_bytes: Ограничение суммарного размера значений; значение больше `max_bytes` не кэшируется.
+    :param size_of: Приблизительный размер значения в байтах (по умолчанию `sys.getsizeof` - без вложенных объектов).
+    :param typed: Различать аргументы разных типов (`1` и `1.0`).
+    """
+    if maxsize is not None and maxsize < 1:
+        raise ValueError("maxsize must be at least one")
+
+    def wrapper(func: Callable[F_Spec, F_Return]) -> Memoized[F_Spec, F_Return]:
+        cache = _Cache(maxsize, ttl_sec, max_bytes, size_of)
+        inner: Callable[..., Any]
+
+        if inspect.iscoroutinefunction(func):
+            in_flight: dict[Hashable, _Flight] = {}
+
+            def finish(key: Hashable, generation: int, task: asyncio.Task[Any]) -> None:
+                flight = in_flight.get(key)
+                if flight is not None and flight.task is task:
+                    del in_flight[key]
+                if not task.cancelled() and task.exception() is None:
+                    cache.set(key, task.result(), generation)
+
+            @wraps(func)
+            async def async_inner(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> Any:
+                key = _make_key(args, kwargs, typed)
+                if (value := cache.get(key)) is not _MISSING:
+                    return value
+                if (flight := in_flight.get(key)) is not None:
+                    cache.count_coalesced()
+                else:
+                    generation = cache.generation
+                    task = asyncio.create_task(func(*args, **kwargs))
+                    task.add_done_callback(lambda t: finish(key, generation, t))
+                    flight = in_flight[key] = _Flight(task)
+
+                flight.waiters += 1
+                try:
+                    return await asyncio.shield(flight.task)
+                finally:
+                    flight.waiters -= 1
+                    if not flight.waiters and not flight.task.done():
+                        flight.task.cancel()
+                        # отменяемый вызов сразу убирается из ожидания: новые вызовы запускают свой, а не получают
+                        # `CancelledError` чужой отмены
+                        if in_flight.get(key) is flight:
+                            del in_flight[key]
+
+            inner = async_inner
+
+        else:
+
+            @wraps(func)
+            def sync_inner(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> Any:
+                key = _make_key(args, kwargs, typed)
+                if (value := cache.get(key)) is not _MISSING:
+                    return value
+                generation = cache.generation
+                value = func(*args, **kwargs)
+                cache.set(key, value, generation)
+                return value
+
+            inner = sync_inner
+
+        vars(inner).update(cache_info=cache.stats, cache_clear=cache.clear)
+        return cast(Memoized[F_Spec, F_Return], inner)
+
+    return wrapper
+
+
+@memoize(maxsize=2)
+def fib(n: int) -> int:
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+@memoize(ttl_sec=10)
+async def slow_square(x: int) -> int:
+    await asyncio.sleep(1)
+    return x * x
+
+
+async def main() -> list[int]:
+    return await asyncio.gather(*(slow_square(3) for _ in range(5)))
+
+
+if __name__ == "__main__":
+    print(fib(30), fib.cache_info())
+    print(asyncio.run(main()), slow_square.cache_info())
@@ -0,0 +1,135 @@
+import logging
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Callable
+
+import structlog
+
+from snippets.decorators.memory import MemoryStats
+
+
+class EventKind(StrEnum):
+    CALL = "call"  # вызов функции под таймером завершён
+    RETRY = "retry"  # попытка упала, будет повтор
+    SUCCESS = "success"  # попытка успешна
+    FAILURE = "failure"  # все попытки исчерпаны
+    REJECTED = "rejected"  # вызов отклонён разомкнутой цепью
+
+
+@dataclass(frozen=True, slots=True)
+class DecoratorEvent:
+    """
+    Событие декоратора.
+
+    Содержит только сырые значения: строки из них собирает подписчик, если он есть.
+    """
+
+    kind: EventKind
+    func: str
+    elapsed_sec: float
+    attempt: int | None = None
+    exc: BaseException | None = None
+    delay_sec: float | None = None
+    memory: MemoryStats | None = None
+
+    @property
+    def exc_type(self) -> type[BaseException] | None:
+        return None if self.exc is None else type(self.exc)
+
+
+EventSink = Callable[[DecoratorEvent], None]
+
+
+class EventBus:
+    """
+    Список подписчиков на события декораторов.
+
+    Пустая шина ложна, поэтому декораторы проверяют `if events:` и не создают событие без подписчиков.
+    Подписчики хранятся в кортеже, который заменяется целиком: рассылка не требует блокировок.
+    """
+
+    def __init__(self) -> None:
+        self._sinks: tuple[EventSink, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self._sinks)
+
+    def subscribe(self, sink: EventSink) -> Callable[[], None]:
+        """Добавляет подписчика и возвращает функцию для отписки."""
+        self._sinks = (*self._sinks, sink)
+        return lambda: self.unsubscribe(sink)
+
+    def unsubscribe(self, sink: EventSink) -> None:
+        self._sinks = tuple(s for s in self._sinks if s is not sink)
+
+    def emit(self, event: DecoratorEvent) -> None:
+        for sink in self._sinks:
+            sink(event)
+
+
+events = EventBus()
+
+
+def format_event(event: DecoratorEvent) -> str:
+    """Сообщение о событии в прежнем формате `print` декораторов."""
+    match event.kind:
+        case EventKind.CALL if event.memory is not None:
+            return f"Function `{event.func}` took {event.elapsed_sec:.4f} seconds, {event.memory}"
+        case EventKind.CALL:
+            return f"Function `{event.func}` took {event.elapsed_sec:.4f} seconds"
+        case EventKind.RETRY:
+            return f"Failed attempt={event.attempt} with `{event.exc!r}`. Retrying in {event.delay_sec:.2f} seconds..."
+        case EventKind.SUCCESS:
+            return f"Successfully `{event.func}` call, attempt={event.attempt}"
+        case EventKind.FAILURE:
+            return f"Failed `{event.func}` with {event.attempt} attempts, last error `{event.exc!r}`"
+        case EventKind.REJECTED:
+            return f"Circuit is open, `{event.func}` call skipped"
+
+
+def print_sink(event: DecoratorEvent) -> None:
+    print(format_event(event))
+
+
+class LoggingSink:
+    """
+    Подписчик, пишущий события в `logging`.
+
+    Сообщение форматируется самим `logging` и только если уровень включён.
+    """
+
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.INFO) -> None:
+        self.logger = logger or logging.getLogger("snippets.decorators")
+        self.level = level
+
+    def __call__(self, event: DecoratorEvent) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self.logger.log(
+            self.level,
+            "%s %s attempt=%s elapsed=%.4f exc_type=%s memory=%r",
+            event.kind,
+            event.func,
+            event.attempt,
+            event.elapsed_sec,
+            event.exc_type and event.exc_type.__name__,
+            event.memory,
+        )
+
+
+class StructlogSink:
+    """Подписчик, пишущий события в structlog как структурированные поля."""
+
+    def __init__(self, logger: structlog.typing.FilteringBoundLogger | None = None) -> None:
+        self.logger = logger or structlog.get_logger("snippets.decorators")
+
+    def __call__(self, event: DecoratorEvent) -> None:
+        self.logger.info(
+            event.kind,
+            func=event.func,
+            attempt=event.attempt,
+            elapsed_sec=event.elapsed_sec,
+            exc_type=event.exc_type and event.exc_type.__name__,
+            delay_sec=event.delay_sec,
+            memory=event.memory,
+        )
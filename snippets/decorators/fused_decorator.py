@@ -0,0 +1,238 @@
+import asyncio
+import inspect
+import random
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Protocol, overload
+
+from snippets.decorators.events import DecoratorEvent, EventKind, events, print_sink
+from snippets.decorators.latency import latencies
+from snippets.decorators.limit_decorator import LimitDecorator, Limiter
+from snippets.decorators.memory import MemoryProfiler
+from snippets.decorators.retry_decorator import JITTER, RetryDecorator, RetryPolicy, _get_retry_delay, _iter_delays
+from snippets.decorators.tracing import finish_span, start_span
+
+
+class Layer(Protocol):
+    def wrap_source(
+        self, body: list[str], func: Callable[..., Any], namespace: dict[str, Any], n: int, is_async: bool
+    ) -> list[str]:
+        """
+        Оборачивает строки `body` (они присваивают `result`) кодом слоя.
+
+        Имена переменных и констант слоя в `namespace` получают суффикс `n`, чтобы слои не пересекались.
+        """
+        ...
+
+
+def _indent(lines: list[str], level: int = 1) -> list[str]:
+    return [" " * 4 * level + line for line in lines]
+
+
+@dataclass(frozen=True, slots=True)
+class Traced:
+    """Спан на время вызова, как `@traced`."""
+
+    def wrap_source(
+        self, body: list[str], func: Callable[..., Any], namespace: dict[str, Any], n: int, is_async: bool
+    ) -> list[str]:
+        return [
+            f"span{n}, token{n} = start_span(name)",
+            "try:",
+            *_indent(body),
+            "finally:",
+            f"    finish_span(span{n}, token{n})",
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class Timed:
+    """Замер времени (и памяти), как `@timeit_sync` / `@timeit_async`."""
+
+    trace: bool = False
+    memory_every: int | None = None
+    memory_top: int = 5
+
+    def wrap_source(
+        self, body: list[str], func: Callable[..., Any], namespace: dict[str, Any], n: int, is_async: bool
+    ) -> list[str]:
+        namespace[f"histogram{n}"] = latencies.get(f"{func.__module__}.{func.__qualname__}")
+        lines = []
+        if self.memory_every is None:
+            memory = f"memory{n} = None"
+        else:
+            namespace[f"profiler{n}"] = MemoryProfiler(self.memory_every, self.memory_top)
+            lines.append(f"probe{n} = profiler{n}.start() if profiler{n}.should_sample() else None")
+            memory = f"memory{n} = None if probe{n} is None else profiler{n}.stop(probe{n})"
+        if self.trace:
+            lines.append(f"span{n}, token{n} = start_span(name)")
+        return lines + [
+            f"start{n} = time.perf_counter()",
+            f"exc{n} = None",
+            "try:",
+            *_indent(body),
+            "except BaseException as e:",
+            f"    exc{n} = e",
+            "    raise",
+            "finally:",
+            f"    total{n} = time.perf_counter() - start{n}",
+            *([f"    finish_span(span{n}, token{n})"] if self.trace else []),
+            f"    {memory}",
+            f"    histogram{n}.record(total{n})",
+            "    if events:",
+            f"        events.emit(DecoratorEvent(EventKind.CALL, name, total{n}, exc=exc{n}, memory=memory{n}))",
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class Limited:
+    """Ограничение через `limiter`, как `@limited`."""
+
+    limiter: Limiter
+    timeout: float | None = None
+
+    def wrap_source(
+        self, body: list[str], func: Callable[..., Any], namespace: dict[str, Any], n: int, is_async: bool
+    ) -> list[str]:
+        namespace[f"limiter{n}"] = self.limiter
+        namespace[f"timeout{n}"] = self.timeout
+        acquire = f"await limiter{n}.aacquire(timeout{n})" if is_async else f"limiter{n}.acquire(timeout{n})"
+        return [acquire, "try:", *_indent(body), "finally:", f"    limiter{n}.release()"]
+
+
+@dataclass(frozen=True, slots=True)
+class Retry:
+    """Повторные попытки, как `@retry`; параметры те же."""
+
+    count: int = 1
+    delay_sec: float = 0.5
+    backoff: float = 1.0
+    jitter: JITTER = "none"
+    max_delay_sec: float | None = None
+    deadline_sec: float | None = None
+    policy: RetryPolicy | None = None
+
+    def __post_init__(self) -> None:
+        if self.count < 1:
+            raise ValueError("count must be at least one")
+
+    def wrap_source(
+        self, body: list[str], func: Callable[..., Any], namespace: dict[str, Any], n: int, is_async: bool
+    ) -> list[str]:
+        namespace[f"retry{n}"] = self
+        policy = self.policy is not None
+        if is_async and self.deadline_sec is not None:
+            body = [
+                f"async with asyncio.timeout(retry{n}.deadline_sec - (time.monotonic() - started{n})):",
+                *_indent(body),
+            ]
+        sleep = f"await asyncio.sleep(delay{n})" if is_async else f"time.sleep(delay{n})"
+        # вместо `return` - `result` и `break`, чтобы внешние слои отработали так же, как при вложенных декораторах
+        loop = [
+            f"delays{n} = _iter_delays(retry{n}.delay_sec, retry{n}.backoff, retry{n}.jitter, retry{n}.max_delay_sec)",
+            f"started{n} = time.monotonic()",
+            f"for attempt{n} in range(1, {self.count + 1}):",
+            "    try:",
+            *_indent(body, 2),
+            "    except Exception as e:",
+            *([f"        retry{n}.policy.record_failure()"] if policy else []),
+            f"        delay{n} = _get_retry_delay(",
+            f"            attempt{n}, {self.count}, delays{n}, started{n}, retry{n}.deadline_sec, retry{n}.policy",
+            "        )",
+            f"        if delay{n} is None:",
+            "            if events:",
+            f"                elapsed{n} = time.monotonic() - started{n}",
+            f"                events.emit(DecoratorEvent(EventKind.FAILURE, name, elapsed{n}, attempt{n}, e))",
+            "            result = None",
+            "            break",
+            "        if events:",
+            f"            elapsed{n} = time.monotonic() - started{n}",
+            f"            events.emit(DecoratorEvent(EventKind.RETRY, name, elapsed{n}, attempt{n}, e, delay{n}))",
+            f"        {sleep}",
+            "    else:",
+            *([f"        retry{n}.policy.record_success()"] if policy else []),
+            "        if events:",
+            f"            elapsed{n} = time.monotonic() - started{n}",
+            f"            events.emit(DecoratorEvent(EventKind.SUCCESS, name, elapsed{n}, attempt{n}))",
+            "        break",
+        ]
+        if not policy:
+            return loop
+        return [
+            f"probe{n} = retry{n}.policy.admit_call()",
+            f"if probe{n} is None:",
+            "    if events:",
+            "        events.emit(DecoratorEvent(EventKind.REJECTED, name, 0.0))",
+            "    result = None",
+            "else:",
+            "    try:",
+            *_indent(loop, 2),
+            "    except BaseException:",
+            f"        if probe{n}:",
+            f"            retry{n}.policy.release(probe{n})",
+            "        raise",
+        ]
+
+
+@overload
+def fused(*layers: Traced | Timed | Limited) -> LimitDecorator: ...
+
+
+@overload
+def fused(*layers: Layer) -> RetryDecorator: ...
+
+
+def fused(*layers: Layer) -> Any:
+    """
+    Декоратор, выполняющий стек поведений одним кадром вместо вложенных обёрток.
+
+    `fused(Retry(count=3), Timed(), Limited(limiter))` ведёт себя как
+    `@retry(count=3)`, `@timeit_sync`, `@limited(limiter)`, записанные в том же порядке (первый слой - внешний):
+    те же события, спаны, гистограммы и исключения. Код слоёв вкладывается друг в друга в исходнике одной функции,
+    которая компилируется при декорировании, поэтому на вызов приходится один кадр и одна упаковка `*args, **kwargs`.
+    Исходник сгенерированной функции - в атрибуте `__fused_source__`.
+
+    :param layers: `Retry`, `Timed`, `Traced`, `Limited` или свои объекты с `wrap_source`.
+    """
+
+    def wrapper(func: Callable[..., Any]) -> Callable[..., Any]:
+        is_async = inspect.iscoroutinefunction(func)
+        namespace: dict[str, Any] = {
+            "func": func,
+            "name": func.__qualname__,
+            "time": time,
+            "asyncio": asyncio,
+            "events": events,
+            "DecoratorEvent": DecoratorEvent,
+            "EventKind": EventKind,
+            "start_span": start_span,
+            "finish_span": finish_span,
+            "_iter_delays": _iter_delays,
+            "_get_retry_delay": _get_retry_delay,
+        }
+        body = ["result = await func(*args, **kwargs)" if is_async else "result = func(*args, **kwargs)"]
+        for n in reversed(range(len(layers))):
+            body = layers[n].wrap_source(body, func, namespace, n, is_async)
+        source = "\n".join(
+            [f"{'async ' if is_async else ''}def fused(*args, **kwargs):", *_indent([*body, "return result"]), ""]
+        )
+        exec(compile(source, f"<fused {func.__qualname__}>", "exec"), namespace)
+        inner = wraps(func)(namespace["fused"])
+        vars(inner).update(__fused_source__=source)
+        return inner
+
+    return wrapper
+
+
+@fused(Retry(count=5, delay_sec=0.1), Timed(), Traced())
+def random_err(a: float, b: float = 2) -> float:
+    if random.uniform(0, 1) < 0.7:
+        raise ValueError("r error")
+    return a + b
+
+
+if __name__ == "__main__":
+    events.subscribe(print_sink)
+    print(random_err(1, b=2))
+    print(random_err.__fused_source__)  # type: ignore[attr-defined]
@@ -0,0 +1,156 @@
+import json
+import math
+import threading
+from array import array
+from dataclasses import asdict, dataclass
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+@dataclass(frozen=True, slots=True)
+class HistogramSnapshot:
+    count: int
+    sum_sec: float
+    min_sec: float
+    max_sec: float
+    p50: float
+    p90: float
+    p99: float
+    p999: float
+
+    def quantiles(self) -> dict[float, float]:
+        return dict(zip(QUANTILES, (self.p50, self.p90, self.p99, self.p999)))
+
+
+class LatencyHistogram:
+    """
+    Гистограмма длительностей с логарифмическими корзинами (как HdrHistogram).
+
+    Значения хранятся в наносекундах: каждая степень двойки делится на `2 ** sub_bucket_bits` корзин,
+    поэтому относительная погрешность перцентилей не больше `2 ** -sub_bucket_bits` (~3% по умолчанию).
+    Запись - вычисление индекса битовыми операциями и инкремент в заранее выделенном `array`.
+    Значения больше `max_value_sec` попадают в последнюю корзину (`max_sec` остаётся точным).
+    """
+
+    def __init__(self, sub_bucket_bits: int = 5, max_value_sec: float = 3600.0) -> None:
+        self._sub_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        max_exp = max(0, int(max_value_sec * 1e9).bit_length() - sub_bucket_bits - 1)
+        self._last = (max_exp + 2) * self._sub_count - 1
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._counts = array("q", bytes(8 * (self._last + 1)))
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = 0.0
+
+    def _get_index(self, value_ns: int) -> int:
+        if value_ns < self._sub_count:
+            return value_ns
+        exp = value_ns.bit_length() - self._sub_bits - 1
+        return min(self._last, (exp + 1) * self._sub_count + (value_ns >> exp) - self._sub_count)
+
+    def _get_upper_bound_sec(self, index: int) -> float:
+        """Верхняя граница корзины в секундах."""
+        if index < self._sub_count:
+            return (index + 1) / 1e9
+        exp = index // self._sub_count - 1
+        return ((index % self._sub_count + self._sub_count + 1) << exp) / 1e9
+
+    def record(self, seconds: float) -> None:
+        index = self._get_index(max(0, int(seconds * 1e9)))
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+            if seconds < self._min:
+                self._min = seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def snapshot(self, reset: bool = False) -> HistogramSnapshot:
+        """
+        Снимок статистики; перцентили считаются вне блокировки по копии корзин.
+
+        :param reset: Обнулить гистограмму в том же критическом участке (для экспорта интервалами).
+        """
+        with self._lock:
+            counts = self._counts[:]
+            count, total, low, high = self._count, self._sum, self._min, self._max
+            if reset:
+                self._reset()
+        if not count:
+            return HistogramSnapshot(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        ranks = [max(1, math.ceil(q * count)) for q in QUANTILES]
+        values: list[float] = []
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            upper = high if index == self._last else min(high, max(low, self._get_upper_bound_sec(index)))
+            while len(values) < len(ranks) and seen >= ranks[len(values)]:
+                values.append(upper)
+            if len(values) == len(ranks):
+                break
+        p50, p90, p99, p999 = values
+        return HistogramSnapshot(count, total, low, high, p50, p90, p99, p999)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class HistogramRegistry:
+    """
+    Гистограммы по именам функций.
+
+    Декоратор получает свою гистограмму один раз при оборачивании, поэтому глобальная блокировка реестра
+    на горячем пути не берётся: каждый вызов блокирует только гистограмму своей функции.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            if (histogram := self._histograms.get(name)) is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            return histogram
+
+    def snapshot(self, reset: bool = False) -> dict[str, HistogramSnapshot]:
+        with self._lock:
+            histograms = list(self._histograms.items())
+        return {name: histogram.snapshot(reset) for name, histogram in histograms}
+
+    def reset(self) -> None:
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+    def to_json(self, reset: bool = False) -> str:
+        return json.dumps({name: asdict(snap) for name, snap in self.snapshot(reset).items()})
+
+    def to_prometheus(self, metric: str = "function_latency_seconds", reset: bool = False) -> str:
+        """Экспорт в текстовом формате Prometheus как `summary` с меткой `func`."""
+        lines = [f"# TYPE {metric} summary"]
+        for name, snap in self.snapshot(reset).items():
+            label = f'func="{_escape_label(name)}"'
+            for q, value in snap.quantiles().items():
+                lines.append(f'{metric}{{{label},quantile="{q}"}} {value!r}')
+            lines.append(f"{metric}_sum{{{label}}} {snap.sum_sec!r}")
+            lines.append(f"{metric}_count{{{label}}} {snap.count}")
+        return "\n".join(lines) + "\n"
+
+
+latencies = HistogramRegistry()
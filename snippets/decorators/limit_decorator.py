@@ -0,0 +1,255 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from functools import partial, wraps
+from typing import Any, Callable, Coroutine, ParamSpec, Protocol, TypeVar, overload
+
+from snippets.decorators.latency import LatencyHistogram
+
+F_Spec = ParamSpec("F_Spec")
+F_Return = TypeVar("F_Return")
+
+
+class Limiter(Protocol):
+    wait_times: LatencyHistogram
+
+    def acquire(self, timeout: float | None = None) -> float: ...
+
+    async def aacquire(self, timeout: float | None = None) -> float: ...
+
+    def release(self) -> None: ...
+
+
+class LimitDecorator(Protocol):
+    @overload
+    def __call__(
+        self, func: Callable[F_Spec, Coroutine[Any, Any, F_Return]]
+    ) -> Callable[F_Spec, Coroutine[Any, Any, F_Return]]: ...
+
+    @overload
+    def __call__(self, func: Callable[F_Spec, F_Return]) -> Callable[F_Spec, F_Return]: ...
+
+
+class TokenBucket:
+    """
+    Ограничение частоты: `rate` вызовов в секунду, всплеском до `capacity`.
+
+    Вызов резервирует токен сразу (счётчик может уйти в минус) и получает точное время ожидания,
+    поэтому ждущий спит один раз без опроса, а вызовы проходят в порядке резервирования.
+    Если ожидание больше `timeout`, токен не резервируется и выбрасывается `TimeoutError`.
+    Потокобезопасен; один объект можно использовать для нескольких функций, синхронных и асинхронных.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least one")
+        self.rate = rate
+        self.capacity = capacity
+        self.wait_times = LatencyHistogram()
+        self.rejected = 0
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, timeout: float | None) -> float:
+        """Резервирует токен и возвращает, сколько ждать до его появления."""
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                self._tokens = tokens
+                self.rejected += 1
+                raise TimeoutError(f"Rate limit: next call possible in {wait:.3f} seconds")
+            self._tokens = tokens - 1
+        self.wait_times.record(wait)
+        return wait
+
+    def _refund(self) -> None:
+        with self._lock:
+            self._tokens += 1
+
+    def acquire(self, timeout: float | None = None) -> float:
+        if wait := self._reserve(timeout):
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, timeout: float | None = None) -> float:
+        if wait := self._reserve(timeout):
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                self._refund()
+                raise
+        return wait
+
+    def release(self) -> None:
+        pass
+
+
+class _Waiter:
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake: Callable[[], object]) -> None:
+        self.wake = wake
+        self.granted = False
+
+
+def _set_result(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """
+    Не больше `limit` одновременных вызовов.
+
+    Ожидающие - и потоки, и корутины (в том числе из разных event loop) - обслуживаются в порядке очереди:
+    освободившееся место передаётся первому ожидающему под блокировкой, поэтому при отмене или таймауте
+    уже переданное место не теряется, а отдаётся следующему.
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError("limit must be at least one")
+        self.limit = limit
+        self.wait_times = LatencyHistogram()
+        self.rejected = 0
+        self._available = limit
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self.limit - self._available
+
+    def _try_acquire(self, make_wake: Callable[[], Callable[[], object]]) -> _Waiter | None:
+        """Занимает место сразу или ставит в очередь и возвращает ожидающего (пробуждение создаётся только тогда)."""
+        with self._lock:
+            if self._available and not self._waiters:
+                self._available -= 1
+                return None
+            waiter = _Waiter(make_wake())
+            self._waiters.append(waiter)
+            return waiter
+
+    def _cancel(self, waiter: _Waiter) -> bool:
+        """Убирает ожидающего из очереди; `False`, если место ему уже передано."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            self.rejected += 1
+            return True
+
+    def _finish(self, started: float) -> float:
+        wait = time.monotonic() - started
+        self.wait_times.record(wait)
+        return wait
+
+    def acquire(self, timeout: float | None = None) -> float:
+        started = time.monotonic()
+        event = None
+
+        def make_wake() -> Callable[[], object]:
+            nonlocal event
+            event = threading.Event()
+            return event.set
+
+        if (waiter := self._try_acquire(make_wake)) is not None:
+            assert event is not None
+            if not event.wait(timeout) and self._cancel(waiter):
+                raise TimeoutError(f"Concurrency limit {self.limit}: no slot in {timeout} seconds")
+        return self._finish(started)
+
+    async def aacquire(self, timeout: float | None = None) -> float:
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        if (waiter := self._try_acquire(lambda: partial(loop.call_soon_threadsafe, _set_result, future))) is not None:
+            try:
+                async with asyncio.timeout(timeout):
+                    await future
+            except BaseException:
+                if self._cancel(waiter):
+                    raise
+                self.release()
+                raise
+        return self._finish(started)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+            else:
+                self._available += 1
+                return
+        waiter.wake()
+
+
+def limited(limiter: Limiter, *, timeout: float | None = None) -> LimitDecorator:
+    """
+    Декоратор, пропускающий вызовы через `limiter` (`TokenBucket`, `ConcurrencyLimiter`).
+
+    Синхронная функция блокирует поток до разрешения, корутинная - ждёт без блокировки event loop.
+    Время ожидания в очереди записывается в `limiter.wait_times`. Ограничения комбинируются наложением декораторов.
+
+    :param limiter: Ограничитель; один объект можно передать нескольким функциям, чтобы они делили лимит.
+    :param timeout: Сколько ждать разрешения: `None` - сколько потребуется, `0` - не ждать.
+        Если разрешение не получено, выбрасывается `TimeoutError`, а функция не вызывается.
+    """
+
+    def wrapper(func: Callable[F_Spec, Any]) -> Callable[F_Spec, Any]:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_inner(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> Any:
+                await limiter.aacquire(timeout)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    limiter.release()
+
+            return async_inner
+
+        @wraps(func)
+        def inner(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> Any:
+            limiter.acquire(timeout)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                limiter.release()
+
+        return inner
+
+    return wrapper
+
+
+api_rate = TokenBucket(rate=5, capacity=2)
+
+
+@limited(api_rate)
+def call_api(i: int) -> int:
+    return i
+
+
+@limited(api_rate)
+@limited(ConcurrencyLimiter(2))
+async def async_call_api(i: int) -> int:
+    await asyncio.sleep(0.1)
+    return i
+
+
+async def main() -> list[int]:
+    return await asyncio.gather(*(async_call_api(i) for i in range(5)))
+
+
+if __name__ == "__main__":
+    started = time.monotonic()
+    print([call_api(i) for i in range(5)], f"{time.monotonic() - started:.2f} seconds")
+    print(asyncio.run(main()), f"{time.monotonic() - started:.2f} seconds")
+    print(api_rate.wait_times.snapshot())
@@ -0,0 +1,87 @@
+import itertools
+import threading
+import tracemalloc
+from dataclasses import dataclass
+
+_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+
+_lock = threading.Lock()
+_active = 0
+_started_tracing = False
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryStats:
+    peak_bytes: int  # пик за вызов относительно памяти до вызова
+    net_bytes: int  # сколько осталось занято после вызова
+    top: list[tuple[str, int]]  # "файл:строка" и прирост памяти в байтах
+
+    def __str__(self) -> str:
+        return f"peak={self.peak_bytes}B net={self.net_bytes:+}B"
+
+
+@dataclass(frozen=True, slots=True)
+class _MemoryProbe:
+    current: int
+    snapshot: tracemalloc.Snapshot | None
+
+
+def _acquire_tracing() -> None:
+    """Включает tracemalloc на время замеров, если он не был включён раньше."""
+    global _active, _started_tracing
+    with _lock:
+        if not _active and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _active += 1
+
+
+def _release_tracing() -> None:
+    global _active, _started_tracing
+    with _lock:
+        _active -= 1
+        if not _active and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class MemoryProfiler:
+    """
+    Замер памяти каждого `every`-го вызова через tracemalloc.
+
+    tracemalloc включается только на время замеренных вызовов (если его не включили снаружи), поэтому
+    остальные вызовы не замедляются. Пик сбрасывается в начале вызова, так что параллельные вызовы
+    (потоки, задачи asyncio) влияют на замеры друг друга - цифры для них приблизительные.
+    Места аллокаций - строки с наибольшим приростом памяти за вызов, временные аллокации видны только в пике.
+
+    :param every: Замерять каждый N-й вызов.
+    :param top: Сколько мест аллокаций сохранять (0 - не делать снимков, только пик и прирост).
+    """
+
+    def __init__(self, every: int = 100, top: int = 5) -> None:
+        if every < 1:
+            raise ValueError("every must be at least one")
+        self.every = every
+        self.top = top
+        self._calls = itertools.count()
+
+    def should_sample(self) -> bool:
+        return next(self._calls) % self.every == 0
+
+    def start(self) -> _MemoryProbe:
+        _acquire_tracing()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS) if self.top else None
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return _MemoryProbe(current, snapshot)
+
+    def stop(self, probe: _MemoryProbe) -> MemoryStats:
+        current, peak = tracemalloc.get_traced_memory()
+        top = []
+        if probe.snapshot is not None:
+            diff = tracemalloc.take_snapshot().filter_traces(_FILTERS).compare_to(probe.snapshot, "lineno")
+            for stat in [stat for stat in diff if stat.size_diff > 0][: self.top]:
+                frame = stat.traceback[0]
+                top.append((f"{frame.filename}:{frame.lineno}", stat.size_diff))
+        _release_tracing()
+        return MemoryStats(peak - probe.current, current - probe.current, top)
@@ -1,41 +1,340 @@
+import asyncio
+import inspect
 import random
+import threading
 import time
+from enum import StrEnum
 from functools import wraps
-from typing import Callable, ParamSpec, TypeVar
+from typing import Any, Callable, Coroutine, Iterator, Literal, ParamSpec, Protocol, TypeVar, overload
+
+from snippets.decorators.events import DecoratorEvent, EventKind, events, print_sink
 
 F_Spec = ParamSpec("F_Spec")
 F_Return = TypeVar("F_Return")
 
+JITTER = Literal["none", "full", "decorrelated"]
+
+
+class RetryDecorator(Protocol):
+    @overload
+    def __call__(
+        self, func: Callable[F_Spec, Coroutine[Any, Any, F_Return]]
+    ) -> Callable[F_Spec, Coroutine[Any, Any, F_Return | None]]: ...
+
+    @overload
+    def __call__(self, func: Callable[F_Spec, F_Return]) -> Callable[F_Spec, F_Return | None]: ...
+
+
+class RetryBudget:
+    """
+    Общий бюджет повторов (token bucket): каждый вызов добавляет `ratio` токена, каждый повтор тратит токен.
+
+    Повторы разрешены, пока есть целый токен, поэтому в среднем повторов не больше `ratio` от числа вызовов,
+    а запас `max_tokens` позволяет пережить короткие всплески ошибок.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Автомат closed -> open -> half-open.
+
+    После `failure_threshold` ошибок подряд цепь размыкается, и вызовы отклоняются без обращения к зависимости.
+    Через `reset_timeout_sec` пропускается до `half_open_max_calls` пробных вызовов: успех замыкает цепь,
+    ошибка снова размыкает. Пробный вызов, прерванный без результата (отмена, `KeyboardInterrupt`),
+    должен вернуть слот через `release_probe` с номером, полученным от `admit`, иначе цепь останется в half-open
+    без свободных слотов. Вызовы, не занявшие слот (пропущенные в closed или в прошлом периоде half-open),
+    слот не возвращают.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout_sec: float = 30.0, half_open_max_calls: int = 1
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._probe_period = 0
+        self._lock = threading.Lock()
+
+    def _get_state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_sec:
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+            self._probe_period += 1
+        return self._state
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._get_state()
+
+    def admit(self) -> int | None:
+        """
+        Пропускает вызов: `None` - отклонён, `0` - пропущен в closed,
+        иначе занят слот пробного вызова и возвращается номер периода half-open для `release_probe`.
+        """
+        with self._lock:
+            state = self._get_state()
+            if state is CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return self._probe_period
+            return 0 if state is CircuitState.CLOSED else None
+
+    def allow(self) -> bool:
+        """Можно ли выполнить вызов (в half-open - занимает слот пробного вызова)."""
+        return self.admit() is not None
+
+    def release_probe(self, probe: int) -> None:
+        """Возвращает слот пробного вызова `probe` (номер от `admit`), завершившегося без успеха и без ошибки."""
+        with self._lock:
+            if (
+                probe
+                and probe == self._probe_period
+                and self._get_state() is CircuitState.HALF_OPEN
+                and self._half_open_calls
+            ):
+                self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._get_state() is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Политика, общая для всех функций клиента: бюджет повторов и/или circuit breaker.
+
+    Потокобезопасна (состояние меняется под коротким `threading.Lock`, без ожиданий внутри),
+    поэтому одну политику можно использовать и из синхронных, и из асинхронных обёрток `retry`.
+    """
+
+    def __init__(self, budget: RetryBudget | None = None, breaker: CircuitBreaker | None = None) -> None:
+        self.budget = budget
+        self.breaker = breaker
+
+    def admit_call(self) -> int | None:
+        """Пропускает вызов, как `CircuitBreaker.admit`; без breaker - всегда `0`."""
+        probe = 0 if self.breaker is None else self.breaker.admit()
+        if probe is not None and self.budget is not None:
+            self.budget.deposit()
+        return probe
+
+    def allow_call(self) -> bool:
+        return self.admit_call() is not None
+
+    def allow_retry(self) -> bool:
+        if self.breaker is not None and self.breaker.state is not CircuitState.CLOSED:
+            return False
+        return self.budget is None or self.budget.withdraw()
+
+    def record_success(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+    def release(self, probe: int) -> None:
+        """Вызов, пропущенный `admit_call`, прерван `BaseException`: исход неизвестен, его слот освобождается."""
+        if self.breaker is not None and probe:
+            self.breaker.release_probe(probe)
+
+
+def _iter_delays(delay_sec: float, backoff: float, jitter: JITTER, max_delay_sec: float | None) -> Iterator[float]:
+    """
+    Задержки перед повторными попытками.
+
+    - none: `delay_sec * backoff ** n`;
+    - full: случайная задержка от 0 до `delay_sec * backoff ** n`;
+    - decorrelated: случайная задержка от `delay_sec` до утроенной предыдущей.
+    """
+    cap = float("inf") if max_delay_sec is None else max_delay_sec
+    curr_delay = prev_delay = delay_sec
+    while True:
+        if jitter == "full":
+            yield random.uniform(0, min(curr_delay, cap))
+        elif jitter == "decorrelated":
+            prev_delay = min(cap, random.uniform(delay_sec, prev_delay * 3))
+            yield prev_delay
+        else:
+            yield min(curr_delay, cap)
+        curr_delay *= backoff
+
+
+def _get_retry_delay(
+    attempt: int,
+    count: int,
+    delays: Iterator[float],
+    started: float,
+    deadline_sec: float | None,
+    policy: RetryPolicy | None,
+) -> float | None:
+    """Задержка перед следующей попыткой или `None`, если попытки, время или бюджет политики закончились."""
+    if attempt >= count:
+        return None
+    delay = next(delays)
+    if deadline_sec is not None and time.monotonic() - started + delay >= deadline_sec:
+        return None
+    if policy is not None and not policy.allow_retry():
+        return None
+    return delay
+
 
 def retry(
     count: int = 1,
     delay_sec: float = 0.5,
     backoff: float = 1.0,  # off by default
-) -> Callable[[Callable[F_Spec, F_Return]], Callable[F_Spec, F_Return | None]]:
+    *,
+    jitter: JITTER = "none",
+    max_delay_sec: float | None = None,
+    deadline_sec: float | None = None,
+    policy: RetryPolicy | None = None,
+) -> RetryDecorator:
     """
     Декоратор для повторной попытки выполнения функции.
 
+    Для корутинных функций задержка между попытками - `asyncio.sleep`, event loop не блокируется.
+    Попытки, задержки и итог отправляются подписчикам `events`; без подписчиков события не создаются.
+
     :param count: Количество попыток.
     :param delay_sec: Начальная задержка между попытками.
     :param backoff: Множитель для экспоненциального увеличения задержки между попытками.
+    :param jitter: Случайный разброс задержки (`full`, `decorrelated`), чтобы повторы разных вызовов не совпадали.
+    :param max_delay_sec: Максимальная задержка между попытками.
+    :param deadline_sec: Общий бюджет времени на все попытки: повтор не запускается, если не успеет начаться
+        до его окончания, а попытка корутины прерывается по его окончании.
+    :param policy: Общая для нескольких функций `RetryPolicy`: при разомкнутой цепи вызов сразу завершается
+        неудачей (без попыток и задержек), повторы ограничены бюджетом.
     """
+    if count < 1:
+        raise ValueError("count must be at least one")
 
-    def wrapper(func: Callable[F_Spec, F_Return]) -> Callable[F_Spec, F_Return | None]:
-        @wraps(func)
-        def inner(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return | None:
-            curr_delay = delay_sec
-            for attempt in range(1, count + 1):
+    def wrapper(func: Callable[F_Spec, Any]) -> Callable[F_Spec, Any]:
+        name = func.__qualname__
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_inner(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> Any:
+                probe = 0 if policy is None else policy.admit_call()
+                if probe is None:
+                    if events:
+                        events.emit(DecoratorEvent(EventKind.REJECTED, name, 0.0))
+                    return None
                 try:
-                    res = func(*args, **kwargs)
-                except Exception as e:
-                    print(f"Failed {attempt=} with `{e}`. Retrying in {curr_delay} seconds...")
-                    time.sleep(curr_delay)
-                    curr_delay = round(curr_delay * backoff, 1)
-                else:
-                    print(f"Successfully `{func.__name__} {args, kwargs}` call, {attempt=}")
-                    return res
-            print(f"Failed `{func.__name__} {args, kwargs}` with {count} attempts")
-            return None
+                    delays = _iter_delays(delay_sec, backoff, jitter, max_delay_sec)
+                    started = time.monotonic()
+                    for attempt in range(1, count + 1):
+                        try:
+                            if deadline_sec is None:
+                                res = await func(*args, **kwargs)
+                            else:
+                                async with asyncio.timeout(deadline_sec - (time.monotonic() - started)):
+                                    res = await func(*args, **kwargs)
+                        except Exception as e:
+                            if policy is not None:
+                                policy.record_failure()
+                            curr_delay = _get_retry_delay(attempt, count, delays, started, deadline_sec, policy)
+                            if curr_delay is None:
+                                if events:
+                                    elapsed = time.monotonic() - started
+                                    events.emit(DecoratorEvent(EventKind.FAILURE, name, elapsed, attempt, e))
+                                return None
+                            if events:
+                                elapsed = time.monotonic() - started
+                                events.emit(DecoratorEvent(EventKind.RETRY, name, elapsed, attempt, e, curr_delay))
+                            await asyncio.sleep(curr_delay)
+                        else:
+                            if policy is not None:
+                                policy.record_success()
+                            if events:
+                                elapsed = time.monotonic() - started
+                                events.emit(DecoratorEvent(EventKind.SUCCESS, name, elapsed, attempt))
+                            return res
+                    return None
+                except BaseException:
+                    if policy is not None and probe:
+                        policy.release(probe)
+                    raise
+
+            return async_inner
+
+        @wraps(func)
+        def inner(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> Any:
+            probe = 0 if policy is None else policy.admit_call()
+            if probe is None:
+                if events:
+                    events.emit(DecoratorEvent(EventKind.REJECTED, name, 0.0))
+                return None
+            try:
+                delays = _iter_delays(delay_sec, backoff, jitter, max_delay_sec)
+                started = time.monotonic()
+                for attempt in range(1, count + 1):
+                    try:
+                        res = func(*args, **kwargs)
+                    except Exception as e:
+                        if policy is not None:
+                            policy.record_failure()
+                        curr_delay = _get_retry_delay(attempt, count, delays, started, deadline_sec, policy)
+                        if curr_delay is None:
+                            if events:
+                                elapsed = time.monotonic() - started
+                                events.emit(DecoratorEvent(EventKind.FAILURE, name, elapsed, attempt, e))
+                            return None
+                        if events:
+                            elapsed = time.monotonic() - started
+                            events.emit(DecoratorEvent(EventKind.RETRY, name, elapsed, attempt, e, curr_delay))
+                        time.sleep(curr_delay)
+                    else:
+                        if policy is not None:
+                            policy.record_success()
+                        if events:
+                            elapsed = time.monotonic() - started
+                            events.emit(DecoratorEvent(EventKind.SUCCESS, name, elapsed, attempt))
+                        return res
+                return None
+            except BaseException:
+                if policy is not None and probe:
+                    policy.release(probe)
+                raise
 
         return inner
 
@@ -49,5 +348,15 @@ def random_err(a: float, b: float = 2) -> float:
     return a + b
 
 
+@retry(count=5, delay_sec=0.2, backoff=2, jitter="full", deadline_sec=2)
+async def async_random_err(a: float, b: float = 2) -> float:
+    await asyncio.sleep(0.1)
+    if random.uniform(0, 1) < 0.7:
+        raise ValueError("r error")
+    return a + b
+
+
 if __name__ == "__main__":
+    events.subscribe(print_sink)
     print(random_err(1, b=2))
+    print(asyncio.run(async_random_err(1, b=2)))
@@ -2,54 +2,150 @@ import random
 import time
 import functools
 import asyncio
-from typing import Callable, TypeVar, ParamSpec, Any, Coroutine
+from typing import Callable, TypeVar, ParamSpec, Any, Coroutine, overload
+
+from snippets.decorators.events import DecoratorEvent, EventKind, events, print_sink
+from snippets.decorators.latency import latencies
+from snippets.decorators.memory import MemoryProfiler
+from snippets.decorators.tracing import finish_span, start_span, tracer
 
 F_Spec = ParamSpec("F_Spec")
 F_Return = TypeVar("F_Return")
 
 
-def timeit_sync(func: Callable[F_Spec, F_Return]) -> Callable[F_Spec, F_Return]:
-    """Декоратор для замера времени выполнения синхронных функций."""
-
-    @functools.wraps(func)
-    def wrapper(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return:
-        start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        total_time = time.perf_counter() - start_time
-        print(f"Function `{func.__name__}` took {total_time:.4f} seconds")
-        return result
-
-    return wrapper
-
-
+@overload
+def timeit_sync(func: Callable[F_Spec, F_Return], /) -> Callable[F_Spec, F_Return]: ...
+
+
+@overload
+def timeit_sync(
+    *, trace: bool = False, memory_every: int | None = None, memory_top: int = 5
+) -> Callable[[Callable[F_Spec, F_Return]], Callable[F_Spec, F_Return]]: ...
+
+
+def timeit_sync(
+    func: Callable[F_Spec, F_Return] | None = None,
+    /,
+    *,
+    trace: bool = False,
+    memory_every: int | None = None,
+    memory_top: int = 5,
+) -> Any:
+    """
+    Декоратор для замера времени выполнения синхронных функций.
+
+    Время вызова записывается в гистограмму функции в реестре `latencies`, а вместе с типом исключения
+    (если функция упала) отправляется подписчикам `events`. Спаны по умолчанию не создаются и ничего не накапливается,
+    поэтому замер можно держать включённым постоянно.
+    Можно использовать как `@timeit_sync` и как `@timeit_sync(trace=True, memory_every=...)`.
+
+    :param trace: Открывать на время вызова спан (см. `tracing`); спан сохраняется в `tracer`.
+    :param memory_every: Замерять память (пик, прирост, места аллокаций) каждого N-го вызова через tracemalloc;
+        результат попадает в `DecoratorEvent.memory`. По умолчанию выключено.
+    :param memory_top: Сколько мест аллокаций сохранять в замере.
+    """
+    profiler = None if memory_every is None else MemoryProfiler(memory_every, memory_top)
+
+    def decorator(func: Callable[F_Spec, F_Return]) -> Callable[F_Spec, F_Return]:
+        name = func.__qualname__
+        histogram = latencies.get(f"{func.__module__}.{name}")
+
+        @functools.wraps(func)
+        def wrapper(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return:
+            probe = profiler.start() if profiler is not None and profiler.should_sample() else None
+            span = start_span(name) if trace else None
+            start_time = time.perf_counter()
+            exc = None
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                exc = e
+                raise
+            finally:
+                total_time = time.perf_counter() - start_time
+                if span is not None:
+                    finish_span(*span)
+                memory = None if probe is None or profiler is None else profiler.stop(probe)
+                histogram.record(total_time)
+                if events:
+                    events.emit(DecoratorEvent(EventKind.CALL, name, total_time, exc=exc, memory=memory))
+
+        return wrapper
+
+    return decorator if func is None else decorator(func)
+
+
+@overload
 def timeit_async(
-    func: Callable[F_Spec, Coroutine[Any, Any, F_Return]]
-) -> Callable[F_Spec, Coroutine[Any, Any, F_Return]]:
-    """Декоратор для замера времени выполнения асинхронных функций."""
+    func: Callable[F_Spec, Coroutine[Any, Any, F_Return]], /
+) -> Callable[F_Spec, Coroutine[Any, Any, F_Return]]: ...
 
-    @functools.wraps(func)
-    async def wrapper(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return:
-        start_time = time.perf_counter()
-        result = await func(*args, **kwargs)
-        total_time = time.perf_counter() - start_time
-        print(f"Function `{func.__name__}` took {total_time:.4f} seconds")
-        return result
 
-    return wrapper
+@overload
+def timeit_async(
+    *, trace: bool = False, memory_every: int | None = None, memory_top: int = 5
+) -> Callable[[Callable[F_Spec, Coroutine[Any, Any, F_Return]]], Callable[F_Spec, Coroutine[Any, Any, F_Return]]]: ...
 
 
-@timeit_sync
+def timeit_async(
+    func: Callable[F_Spec, Coroutine[Any, Any, F_Return]] | None = None,
+    /,
+    *,
+    trace: bool = False,
+    memory_every: int | None = None,
+    memory_top: int = 5,
+) -> Any:
+    """
+    Декоратор для замера времени выполнения асинхронных функций.
+
+    Параметры - как у `timeit_sync`; замер памяти захватывает и аллокации задач, выполнявшихся во время `await`.
+    """
+    profiler = None if memory_every is None else MemoryProfiler(memory_every, memory_top)
+
+    def decorator(
+        func: Callable[F_Spec, Coroutine[Any, Any, F_Return]]
+    ) -> Callable[F_Spec, Coroutine[Any, Any, F_Return]]:
+        name = func.__qualname__
+        histogram = latencies.get(f"{func.__module__}.{name}")
+
+        @functools.wraps(func)
+        async def wrapper(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return:
+            probe = profiler.start() if profiler is not None and profiler.should_sample() else None
+            span = start_span(name) if trace else None
+            start_time = time.perf_counter()
+            exc = None
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as e:
+                exc = e
+                raise
+            finally:
+                total_time = time.perf_counter() - start_time
+                if span is not None:
+                    finish_span(*span)
+                memory = None if probe is None or profiler is None else profiler.stop(probe)
+                histogram.record(total_time)
+                if events:
+                    events.emit(DecoratorEvent(EventKind.CALL, name, total_time, exc=exc, memory=memory))
+
+        return wrapper
+
+    return decorator if func is None else decorator(func)
+
+
+@timeit_sync(trace=True)
 def slp(t: float) -> float:
     time.sleep(t)
     return t
 
 
-@timeit_async
+@timeit_async(trace=True)
 async def aslp(t: float) -> float:
     await asyncio.sleep(t)
     return t
 
 
+@timeit_async(trace=True)
 async def main() -> list[float]:
     tasks: list[asyncio.Task[float]] = [asyncio.create_task(aslp(random.uniform(0, 1))) for _ in range(5)]
     await asyncio.gather(*tasks)
@@ -57,5 +153,8 @@ async def main() -> list[float]:
 
 
 if __name__ == "__main__":
+    events.subscribe(print_sink)
     print(slp(random.uniform(0, 1)))
     print(asyncio.run(main()))
+    print(latencies.to_prometheus(), end="")
+    print(*tracer.finished, sep="\n")
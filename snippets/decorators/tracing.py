@@ -0,0 +1,196 @@
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Any, Callable, Iterator, ParamSpec, TypeVar
+
+F_Spec = ParamSpec("F_Spec")
+F_Return = TypeVar("F_Return")
+
+_span_ids = itertools.count(1)
+_children_lock = threading.Lock()  # дети одного спана могут завершаться в разных потоках
+
+
+class Span:
+    """
+    Интервал выполнения с родителем.
+
+    `self_sec` - время, не покрытое дочерними спанами. Дочерние интервалы объединяются, поэтому
+    параллельные дети (`asyncio.gather`) не делают собственное время родителя отрицательным.
+    Интервалы завершённых детей сразу сворачиваются в сумму покрытого времени; отдельно хранятся только те,
+    что ещё могут пересечься с работающими детьми, так что долгоживущий родитель не накапливает память.
+    """
+
+    __slots__ = (
+        "name",
+        "parent",
+        "span_id",
+        "tid",
+        "start_sec",
+        "end_sec",
+        "self_sec",
+        "_covered",
+        "_intervals",
+        "_open",
+    )
+
+    def __init__(self, name: str, parent: "Span | None", tid: int) -> None:
+        self.name = name
+        self.parent = parent
+        self.span_id = next(_span_ids)
+        self.tid = tid
+        self.start_sec = time.perf_counter()
+        self.end_sec: float | None = None
+        self.self_sec = 0.0
+        self._covered = 0.0
+        self._intervals: list[tuple[float, float]] = []  # непересекающиеся, по возрастанию
+        self._open: dict[int, float] = {}  # span_id работающего ребёнка -> его начало
+        if parent is not None and parent.end_sec is None:
+            with _children_lock:
+                parent._open[self.span_id] = self.start_sec
+
+    @property
+    def total_sec(self) -> float:
+        return (time.perf_counter() if self.end_sec is None else self.end_sec) - self.start_sec
+
+    def _add_child(self, child: "Span", end: float) -> None:
+        """Добавляет интервал завершённого ребёнка и сворачивает интервалы, которые больше ни с чем не пересекутся."""
+        start = child.start_sec
+        with _children_lock:
+            self._open.pop(child.span_id, None)
+            intervals = []
+            for other_start, other_end in self._intervals:
+                if other_end < start or other_start > end:
+                    intervals.append((other_start, other_end))
+                else:
+                    start, end = min(start, other_start), max(end, other_end)
+            intervals.append((start, end))
+            intervals.sort()
+            # будущие дети начнутся позже, чем сейчас, работающие - не раньше самого раннего начала
+            limit = min(self._open.values(), default=float("inf"))
+            folded = 0
+            for interval_start, interval_end in intervals:
+                if interval_end > limit:
+                    break
+                self._covered += interval_end - interval_start
+                folded += 1
+            self._intervals = intervals[folded:]
+
+    def _finish(self) -> None:
+        end = self.end_sec = time.perf_counter()
+        with _children_lock:
+            covered = self._covered + sum(
+                min(child_end, end) - child_start for child_start, child_end in self._intervals
+            )
+            self._intervals = []
+            self._open.clear()
+        self.self_sec = end - self.start_sec - covered
+        if self.parent is not None and self.parent.end_sec is None:
+            self.parent._add_child(self, end)
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, total_sec={self.total_sec:.6f}, self_sec={self.self_sec:.6f})"
+
+
+class Tracer:
+    """Завершённые спаны (последние `maxlen`) и их экспорт в формат Chrome trace events."""
+
+    def __init__(self, maxlen: int = 100_000) -> None:
+        self.finished: deque[Span] = deque(maxlen=maxlen)
+
+    def clear(self) -> None:
+        self.finished.clear()
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Trace events для `chrome://tracing` / Perfetto.
+
+        Спаны разных задач и потоков раскладываются по разным дорожкам (`tid`), чтобы интервалы на одной дорожке
+        были вложены друг в друга.
+        """
+        pid = os.getpid()
+        lanes: dict[int, int] = {}
+        trace_events = []
+        for span in list(self.finished):
+            assert span.end_sec is not None
+            trace_events.append(
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": span.start_sec * 1e6,
+                    "dur": (span.end_sec - span.start_sec) * 1e6,
+                    "pid": pid,
+                    "tid": lanes.setdefault(span.tid, len(lanes) + 1),
+                    "args": {
+                        "self_ms": span.self_sec * 1e3,
+                        "span_id": span.span_id,
+                        "parent_id": span.parent and span.parent.span_id,
+                    },
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def to_chrome_json(self) -> str:
+        return json.dumps(self.to_chrome_trace())
+
+
+tracer = Tracer()
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def _get_lane() -> int:
+    """Идентификатор текущей задачи asyncio, а вне event loop - потока."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return threading.get_ident()
+    return threading.get_ident() if task is None else id(task)
+
+
+def start_span(name: str) -> tuple[Span, Token[Span | None]]:
+    """Открывает спан, дочерний к текущему в этом контексте; закрывать - `finish_span` в том же контексте."""
+    span = Span(name, current_span.get(), _get_lane())
+    return span, current_span.set(span)
+
+
+def finish_span(span: Span, token: Token[Span | None]) -> None:
+    current_span.reset(token)
+    span._finish()
+    tracer.finished.append(span)
+
+
+@contextmanager
+def trace_span(name: str) -> Iterator[Span]:
+    """Контекстный менеджер спана; работает и в синхронном коде, и внутри корутин."""
+    span, token = start_span(name)
+    try:
+        yield span
+    finally:
+        finish_span(span, token)
+
+
+def traced(func: Callable[F_Spec, F_Return]) -> Callable[F_Spec, F_Return]:
+    """Декоратор, открывающий спан на время вызова функции или выполнения корутины."""
+    name = func.__qualname__
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> Any:
+            with trace_span(name):
+                return await func(*args, **kwargs)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @wraps(func)
+    def wrapper(*args: F_Spec.args, **kwargs: F_Spec.kwargs) -> F_Return:
+        with trace_span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -1,35 +1,887 @@
-from typing import Any, Hashable, Mapping, Union
+import array
+import codecs
+import fnmatch
+import json
+import re
+from collections import OrderedDict
+from collections.abc import ItemsView, Mapping
+from functools import lru_cache, partial
+from itertools import islice
+from json.decoder import scanstring  # type: ignore[attr-defined]
+from json.scanner import NUMBER_RE
+from typing import IO, Any, Callable, Hashable, Iterable, Iterator, Union
 
 NestedMapping = Union[Mapping[Hashable, Any], list[Any], set[Any], tuple[Any, ...]]
 
+NESTED_TYPES = (Mapping, list, tuple, set)
+
+JsonSource = Union[str, bytes, bytearray, IO[str], IO[bytes]]
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_MISSING = object()
+
+FlatColumn = Union[list[Any], "array.array[Any]"]
+
+# точные типы заведомо плоских значений - проверяются до более дорогого isinstance с ABC
+_LEAF_TYPES = frozenset((str, int, float, bool, type(None)))
+
+Flattener = Callable[[NestedMapping], dict[str, Any]]
+
+COMPILED_FLATTENERS_MAXSIZE = 128
+_compiled_flatteners: OrderedDict[tuple[Any, ...], Flattener] = OrderedDict()
+
+_JSON_LITERALS: dict[str, tuple[str, Any]] = {
+    "n": ("null", None),
+    "t": ("true", True),
+    "f": ("false", False),
+    "N": ("NaN", float("nan")),
+    "I": ("Infinity", float("inf")),
+    "-": ("-Infinity", float("-inf")),
+}
+
+
+def _iter_nested(nested: NestedMapping) -> Iterator[tuple[Any, Any]]:
+    """Итератор пар (ключ, значение) одного уровня вложенности: ключи Mapping или индексы контейнера."""
+    return iter(nested.items()) if isinstance(nested, Mapping) else enumerate(nested)
+
 
 def get_flat_dict_from_nested_mapping(
     nested_dict: NestedMapping,
     *,
     sep: str = ".",
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    max_depth: int | None = None,
+    key_filter: "KeyFilter | None" = None,
     _parent_key: str = "",
 ) -> dict[str, Any]:
     """
     Преобразует вложенный Mapping или Container (кроме плоских - str, bytes) в плоскую структуру.
 
+    Обход итеративный (явный стек итераторов), поэтому глубина вложенности не ограничена recursion limit,
+    а каждый лист записывается в результирующий словарь ровно один раз, без промежуточных словарей.
+
     :param nested_dict: Вложенная структура для преобразования.
     :param sep: Разделитель между уровнями вложенности. По умолчанию: `.`.
+    :param include: Шаблоны путей, которые попадут в результат (см. `KeyFilter`). По умолчанию: все.
+    :param exclude: Шаблоны путей, которые не попадут в результат.
+    :param max_depth: Максимальное число сегментов в ключе, более глубокие контейнеры остаются значениями.
+    :param key_filter: Заранее скомпилированный `compile_key_filter` вместо `include`/`exclude`/`max_depth`:
+        в горячем цикле фильтр не собирается и не ищется в кэше на каждый вызов.
     :param _parent_key: Префикс ключа для текущей вложенности.
     :return: Плоский словарь.
     """
-    items = {}
+    if key_filter is not None:
+        if include is not None or exclude is not None or max_depth is not None:
+            raise ValueError("key_filter can't be combined with include, exclude or max_depth")
+        if key_filter.sep != sep:
+            raise ValueError(f"key_filter was compiled for sep={key_filter.sep!r}, got sep={sep!r}")
+        return _get_filtered_flat_dict(nested_dict, sep, key_filter, _parent_key)
+    if include is not None or exclude is not None or max_depth is not None:
+        key_filter = compile_key_filter(include, exclude, max_depth=max_depth, sep=sep)
+        return _get_filtered_flat_dict(nested_dict, sep, key_filter, _parent_key)
 
-    for key, value in nested_dict.items() if isinstance(nested_dict, Mapping) else enumerate(nested_dict):
-        new_key = f"{_parent_key}{sep}{key}" if _parent_key else str(key)
-        if isinstance(value, (Mapping, list, tuple, set)):
-            items.update(get_flat_dict_from_nested_mapping(value, sep=sep, _parent_key=new_key))
-        else:
+    items: dict[str, Any] = {}
+    stack: list[tuple[str, Iterator[tuple[Any, Any]]]] = [(_parent_key, _iter_nested(nested_dict))]
+
+    while stack:
+        parent_key, children = stack[-1]
+        for key, value in children:
+            new_key = f"{parent_key}{sep}{key}" if parent_key else str(key)
+            if isinstance(value, NESTED_TYPES):
+                # спускаемся на уровень ниже, текущий итератор продолжится после его обхода
+                stack.append((new_key, _iter_nested(value)))
+                break
             items[new_key] = value
+        else:
+            stack.pop()
+
+    return items
+
+
+class _PatternNode:
+    """Узел префиксного дерева шаблонов: переходы по точному сегменту и по сегментам с `*`."""
+
+    __slots__ = ("children", "globs", "terminal")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _PatternNode] = {}
+        self.globs: dict[str, tuple[Callable[[str], Any] | None, _PatternNode]] = {}
+        self.terminal = False
+
+    def add(self, segments: list[str]) -> None:
+        node = self
+        for segment in segments:
+            if "*" not in segment:
+                node = node.children.setdefault(segment, _PatternNode())
+                continue
+            if segment not in node.globs:
+                match = None if segment == "*" else re.compile(fnmatch.translate(segment)).match
+                node.globs[segment] = (match, _PatternNode())
+            node = node.globs[segment][1]
+        node.terminal = True
+
+
+# состояние сопоставления: активные узлы дерева; для include `None` - путь уже целиком подходит
+_PatternState = tuple[_PatternNode, ...]
+
+
+def _step_patterns(state: _PatternState, segment: str) -> _PatternState:
+    next_state = []
+    for node in state:
+        child = node.children.get(segment)
+        if child is not None:
+            next_state.append(child)
+        for match, glob_child in node.globs.values():
+            if match is None or match(segment):
+                next_state.append(glob_child)
+    return tuple(next_state)
+
+
+class KeyFilter:
+    """
+    Скомпилированный фильтр плоских ключей: шаблоны include/exclude и ограничение глубины.
+
+    Шаблон - путь из сегментов через `sep`; сегмент `*` соответствует любому сегменту, `*` внутри сегмента - любой
+    подстроке (`line*`). Шаблон подходит к ключу, если совпадает с ним или с его префиксом по границе сегментов:
+    `address` подходит к `address.street.line1`. Ключ попадает в результат, если к нему подходит какой-либо
+    include (или include не задан) и не подходит ни один exclude.
+    Проверка идёт по мере обхода, поэтому поддеревья, которые не могут попасть в результат, не обходятся.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        *,
+        max_depth: int | None = None,
+        sep: str = ".",
+    ) -> None:
+        if max_depth is not None and max_depth < 1:
+            raise ValueError(f"max_depth must be positive, got {max_depth}")
+        self.max_depth = max_depth
+        self.sep = sep
+        self._include: _PatternState | None = None
+        if include is not None:
+            include_root = _PatternNode()
+            for pattern in include:
+                include_root.add(pattern.split(sep))
+            self._include = (include_root,)
+        exclude_root = _PatternNode()
+        for pattern in exclude or ():
+            exclude_root.add(pattern.split(sep))
+        self._exclude: _PatternState = (exclude_root,) if exclude_root.children or exclude_root.globs else ()
+
+    @property
+    def root(self) -> tuple[_PatternState | None, _PatternState]:
+        """Начальное состояние (include, exclude) для корня структуры."""
+        include = None if self._include is not None and self._include[0].terminal else self._include
+        return include, self._exclude
+
+    @staticmethod
+    def step(
+        include: _PatternState | None, exclude: _PatternState, segment: str
+    ) -> tuple[_PatternState | None, _PatternState] | None:
+        """Состояние для дочернего сегмента или `None`, если под ним ничего не попадёт в результат."""
+        if exclude:
+            exclude = _step_patterns(exclude, segment)
+            if any(node.terminal for node in exclude):
+                return None
+        if include is not None:
+            include = _step_patterns(include, segment)
+            if not include:
+                return None
+            if any(node.terminal for node in include):
+                include = None
+        return include, exclude
+
+
+@lru_cache(maxsize=128)
+def _compile_key_filter(
+    include: tuple[str, ...] | None, exclude: tuple[str, ...] | None, max_depth: int | None, sep: str
+) -> KeyFilter:
+    return KeyFilter(include, exclude, max_depth=max_depth, sep=sep)
+
+
+def compile_key_filter(
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    *,
+    max_depth: int | None = None,
+    sep: str = ".",
+) -> KeyFilter:
+    """
+    Компилирует `KeyFilter` для `get_flat_dict_from_nested_mapping(..., key_filter=...)`.
+
+    Фильтры с теми же шаблонами переиспользуются между вызовами (LRU).
+    """
+    return _compile_key_filter(
+        None if include is None else tuple(include),
+        None if exclude is None else tuple(exclude),
+        max_depth,
+        sep,
+    )
+
+
+def _get_filtered_flat_dict(
+    nested_dict: NestedMapping, sep: str, key_filter: KeyFilter, parent_key: str
+) -> dict[str, Any]:
+    """`get_flat_dict_from_nested_mapping` с фильтром: поддеревья, отброшенные фильтром, не обходятся."""
+    items: dict[str, Any] = {}
+    max_depth = key_filter.max_depth
+    step = key_filter.step
+    include, exclude = key_filter.root
+    # кадр: (префикс ключа, итератор уровня, глубина уровня, состояние include, состояние exclude)
+    stack: list[tuple[str, Iterator[tuple[Any, Any]], int, _PatternState | None, _PatternState]] = [
+        (parent_key, _iter_nested(nested_dict), 1, include, exclude)
+    ]
+
+    while stack:
+        parent_key, children, depth, include, exclude = stack[-1]
+        for key, value in children:
+            if include is not None or exclude:
+                state = step(include, exclude, str(key))
+                if state is None:
+                    continue
+                child_include, child_exclude = state
+            else:
+                child_include, child_exclude = None, ()
+
+            new_key = f"{parent_key}{sep}{key}" if parent_key else str(key)
+            if isinstance(value, NESTED_TYPES) and (max_depth is None or depth < max_depth):
+                stack.append((new_key, _iter_nested(value), depth + 1, child_include, child_exclude))
+                break
+            if child_include is None:
+                items[new_key] = value
+        else:
+            stack.pop()
 
     return items
 
 
+def _get_shape_and_leaves(record: NestedMapping) -> tuple[tuple[Any, ...], list[Any]]:
+    """
+    Обходит запись и возвращает отпечаток её формы (без значений) и листья в порядке обхода.
+
+    Строки плоских ключей не строятся: две записи с одинаковым отпечатком дают одинаковые плоские ключи.
+    Отпечаток уровня - кортежи ключей Mapping и их типов (или длина контейнера) и число листьев на входе/выходе
+    из уровня, по которым однозначно восстанавливается, какие значения уровня вложенные.
+    Типы нужны, потому что равные ключи (`1`, `1.0`, `True`) дают разные плоские ключи.
+    """
+    shape: list[Any] = []
+    leaves: list[Any] = []
+    stack: list[Iterator[Any]] = []
+    node: Any = record
+
+    while True:
+        if isinstance(node, Mapping):
+            keys = tuple(node)
+            shape.append(keys)
+            shape.append(tuple(map(type, keys)))
+            stack.append(iter(node.values()))
+        else:
+            shape.append(len(node))
+            stack.append(iter(node))
+        shape.append(len(leaves))
+
+        node = None
+        while stack:
+            for value in stack[-1]:
+                if value.__class__ in _LEAF_TYPES or not isinstance(value, NESTED_TYPES):
+                    leaves.append(value)
+                    continue
+                node = value
+                break
+            else:
+                stack.pop()
+                shape.append(len(leaves))
+                continue
+            break
+        if node is None:
+            return tuple(shape), leaves
+
+
+def _iter_flat_items(nested: NestedMapping, sep: str) -> Iterator[tuple[str, Any]]:
+    """Ленивый вариант `get_flat_dict_from_nested_mapping`: пары в порядке обхода, совпадающие ключи не схлопываются."""
+    stack: list[tuple[str, Iterator[tuple[Any, Any]]]] = [("", _iter_nested(nested))]
+
+    while stack:
+        parent_key, children = stack[-1]
+        for key, value in children:
+            new_key = f"{parent_key}{sep}{key}" if parent_key else str(key)
+            if isinstance(value, NESTED_TYPES):
+                stack.append((new_key, _iter_nested(value)))
+                break
+            yield new_key, value
+        else:
+            stack.pop()
+
+
+def _get_flat_keys(record: NestedMapping, sep: str) -> list[str]:
+    """Плоские ключи записи в порядке обхода, включая совпадающие (им соответствуют листья `_get_shape_and_leaves`)."""
+    return [key for key, _ in _iter_flat_items(record, sep)]
+
+
+def get_flat_columns_from_records(
+    records: Iterable[NestedMapping],
+    *,
+    sep: str = ".",
+    fill_value: Any = None,
+    typecodes: Mapping[str, str] | None = None,
+) -> dict[str, FlatColumn]:
+    """
+    Преобразует последовательность вложенных записей в колонки: плоский ключ -> значения по всем записям.
+
+    Плоские ключи строятся один раз на каждую форму записи и переиспользуются для следующих записей той же формы,
+    поэтому для однотипных записей стоимость сводится к обходу значений.
+    Если ключа нет в записи, в колонку пишется `fill_value`.
+
+    :param records: Вложенные записи (как для `get_flat_dict_from_nested_mapping`).
+    :param sep: Разделитель между уровнями вложенности. По умолчанию: `.`.
+    :param fill_value: Значение для отсутствующих в записи ключей.
+    :param typecodes: Плоский ключ -> typecode `array.array` для колонок, которые нужно хранить компактно.
+        `fill_value` должен помещаться в такие колонки (например, `0` вместо `None`), иначе `ValueError`.
+    :return: Словарь колонок одинаковой длины (list или array.array).
+    """
+    typecodes = typecodes or {}
+    for key, code in typecodes.items():
+        try:
+            array.array(code, [fill_value])
+        except (TypeError, OverflowError) as e:
+            raise ValueError(f"fill_value {fill_value!r} doesn't fit typed column {key!r} ({code!r}): {e}") from e
+    columns: dict[str, FlatColumn] = {}
+    # форма записи -> (пары (колонка, индекс листа), колонки, которых нет в форме, число колонок на момент расчёта)
+    plans: dict[tuple[Any, ...], tuple[list[tuple[FlatColumn, int]], list[FlatColumn], int]] = {}
+
+    for row, record in enumerate(records):
+        shape, leaves = _get_shape_and_leaves(record)
+        plan = plans.get(shape)
+
+        if plan is None or plan[2] != len(columns):
+            # для совпадающих плоских ключей побеждает последний лист, как в `get_flat_dict_from_nested_mapping`
+            leaf_indexes = {key: index for index, key in enumerate(_get_flat_keys(record, sep))}
+            for key in leaf_indexes.keys() - columns.keys():
+                typecode = typecodes.get(key)
+                columns[key] = [fill_value] * row if typecode is None else array.array(typecode, [fill_value] * row)
+            missing = [column for key, column in columns.items() if key not in leaf_indexes]
+            plan = ([(columns[key], index) for key, index in leaf_indexes.items()], missing, len(columns))
+            plans[shape] = plan
+
+        for column, index in plan[0]:
+            column.append(leaves[index])
+        for column in plan[1]:
+            column.append(fill_value)
+
+    return columns
+
+
+def _is_index(key: str) -> bool:
+    """Сегмент - неотрицательное целое в каноничной записи (так `str` форматирует индекс)."""
+    return key.isascii() and key.isdigit() and (key[0] != "0" or key == "0")
+
+
+def _get_nested_children(node: NestedMapping, key: str) -> list[Any]:
+    """Значения уровня по сегменту плоского ключа: строковый и int-ключ Mapping или индекс последовательности."""
+    if isinstance(node, Mapping):
+        children = [node[key]] if key in node else []
+        if _is_index(key.removeprefix("-")) and key != "-0" and int(key) in node:
+            children.append(node[int(key)])
+        return children
+
+    if not _is_index(key) or int(key) >= len(node):
+        return []
+    index = int(key)
+    return [next(islice(node, index, None)) if isinstance(node, set) else node[index]]
+
+
+class _FlatItemsView(ItemsView[str, Any]):
+    _mapping: "FlatView"
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        view = self._mapping
+        sep = view.sep
+        seen: set[str] = set()
+        # кадр: (префикс ключа, путь из сегментов, которые `__getitem__` проверяет первыми, уровень, его дети)
+        stack: list[tuple[str, bool, Any, Iterator[tuple[Any, Any]]]] = [
+            ("", True, view.nested, _iter_nested(view.nested))
+        ]
+
+        while stack:
+            parent_key, is_first, node, children = stack[-1]
+            is_mapping = isinstance(node, Mapping)
+            for key, value in children:
+                new_key = f"{parent_key}{sep}{key}" if parent_key else str(key)
+                # ключ-не строка, ключ с `sep` и "" в корне уступают другим путям с тем же плоским ключом
+                first = is_first and (not is_mapping or key.__class__ is str and sep not in key and bool(new_key))
+                if isinstance(value, NESTED_TYPES):
+                    stack.append((new_key, first, value, _iter_nested(value)))
+                    break
+                if new_key not in seen:
+                    seen.add(new_key)
+                    yield new_key, value if first else view[new_key]
+            else:
+                stack.pop()
+
+
+class FlatView(Mapping[str, Any]):
+    """
+    Плоское представление вложенной структуры без её преобразования (только чтение).
+
+    `view["address.street.line1"]` проходит только по этому пути, итерация по ключам ленивая, плоский словарь
+    строится только по явному вызову `to_dict`. Изменения исходной структуры сразу видны в представлении.
+    Ключи-не строки Mapping адресуются, только если это int. Если плоские ключи совпадают (исходные ключи
+    содержат `sep` или есть одновременно `1` и `"1"`), ключ встречается в итерации один раз, а по нему, в `items`
+    и в `to_dict` возвращается значение пути из самых коротких сегментов (строковый ключ раньше int), - в отличие
+    от `get_flat_dict_from_nested_mapping`, где остаётся последнее значение.
+    """
+
+    def __init__(self, nested: NestedMapping, *, sep: str = ".") -> None:
+        if not sep:
+            raise ValueError("Separator must be non-empty")
+        self._nested = nested
+        self._sep = sep
+
+    @property
+    def nested(self) -> NestedMapping:
+        return self._nested
+
+    @property
+    def sep(self) -> str:
+        return self._sep
+
+    def __getitem__(self, key: str) -> Any:
+        if not isinstance(key, str):
+            raise KeyError(key)
+
+        sep = self._sep
+        # быстрый путь: dict/list/tuple и каждый сегмент - отдельный ключ (первый путь, который проверил бы обход ниже)
+        node: Any = self._nested
+        for segment in key.split(sep):
+            if node.__class__ is dict:
+                node = node.get(segment, _MISSING)
+            elif (node.__class__ is list or node.__class__ is tuple) and _is_index(segment):
+                node = node[int(segment)] if int(segment) < len(node) else _MISSING
+            else:
+                break
+            if node is _MISSING:
+                break
+        else:
+            if not isinstance(node, NESTED_TYPES) and key.partition(sep)[0]:
+                return node
+
+        # кадр: (уровень, остаток ключа, откуда искать следующий разделитель, префикс ключа пуст)
+        stack: list[tuple[Any, str, int, bool]] = [(self._nested, key, 0, True)]
+        while stack:
+            node, rest, start, is_root = stack.pop()
+            if is_root and start == 0 and isinstance(node, Mapping):
+                # вложенное значение по ключу "" при пустом префиксе не добавляет сегмент (см. `_parent_key`)
+                child = node.get("", _MISSING)
+                if isinstance(child, NESTED_TYPES):
+                    stack.append((child, rest, 0, True))
+
+            pos = rest.find(sep, start)
+            if pos == -1:
+                for value in _get_nested_children(node, rest):
+                    if not isinstance(value, NESTED_TYPES):
+                        return value
+                continue
+
+            # сначала самый короткий сегмент, более длинные (ключи, содержащие `sep`) - при возврате
+            stack.append((node, rest, pos + len(sep), is_root))
+            if is_root and pos == 0:
+                continue
+            for child in reversed(_get_nested_children(node, rest[:pos])):
+                if isinstance(child, NESTED_TYPES):
+                    stack.append((child, rest[pos + len(sep) :], 0, False))
+
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        seen: set[str] = set()
+        for key, _ in _iter_flat_items(self._nested, self._sep):
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    def __len__(self) -> int:
+        return len({key for key, _ in _iter_flat_items(self._nested, self._sep)})
+
+    def items(self) -> ItemsView[str, Any]:
+        return _FlatItemsView(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Полное преобразование в плоский словарь (совпадающие ключи - как в `items`)."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._nested!r}, sep={self._sep!r})"
+
+
+def _build_flattener(sample: NestedMapping, sep: str) -> Flattener:
+    """Генерирует исходный код плоского преобразования для формы `sample` и компилирует его."""
+    constants: dict[str, Any] = {}
+
+    def literal(key: Any) -> str:
+        if key.__class__ is str or key.__class__ is int:
+            return repr(key)
+        name = f"_k{len(constants)}"
+        constants[name] = key
+        return name
+
+    lines: list[str] = []
+    result: list[str] = []
+    stack: list[tuple[str, str, Iterator[tuple[Any, Any]]]] = []
+
+    def open_node(var: str, node: Any, parent_key: str) -> None:
+        # быстрый путь только для dict/list/tuple: обращение по ключу к произвольному Mapping
+        # (например, defaultdict) может иметь побочные эффекты
+        if isinstance(node, Mapping):
+            guard = f"{var}.__class__ is not dict or len({var}) != {len(node)}"
+            if any(key.__class__ is not str for key in node):
+                # `1`, `1.0` и `True` находят одно значение, но дают разные плоские ключи
+                guard += f" or tuple(map(type, {var})) != {literal(tuple(map(type, node)))}"
+            lines.append(f"if {guard}:")
+        else:
+            is_sequence = f"({var}.__class__ is list or {var}.__class__ is tuple)"
+            lines.append(f"if not {is_sequence} or len({var}) != {len(node)}:")
+        lines.append("    return fallback(record)")
+        stack.append((var, parent_key, _iter_nested(node)))
+
+    open_node("record", sample, "")
+    while stack:
+        var, parent_key, children = stack[-1]
+        for key, value in children:
+            new_key = f"{parent_key}{sep}{key}" if parent_key else str(key)
+            child = f"_{len(lines)}"
+            lines.append(f"{child} = {var}[{literal(key)}]")
+            if isinstance(value, NESTED_TYPES):
+                open_node(child, value, new_key)
+                break
+            lines.append(f"if not ({child}.__class__ in LEAF_TYPES or not isinstance({child}, NESTED_TYPES)):")
+            lines.append("    return fallback(record)")
+            result.append(f"{new_key!r}: {child}")
+        else:
+            stack.pop()
+
+    body = "\n".join(f"        {line}" for line in lines)
+    source = (
+        "def flatten(record):\n"
+        "    try:\n"
+        f"{body}\n"
+        "    except LookupError:\n"
+        "        return fallback(record)\n"
+        f"    return {{{', '.join(result)}}}\n"
+    )
+    namespace: dict[str, Any] = {
+        "NESTED_TYPES": NESTED_TYPES,
+        "LEAF_TYPES": _LEAF_TYPES,
+        "fallback": partial(get_flat_dict_from_nested_mapping, sep=sep),
+        **constants,
+    }
+    exec(compile(source, f"<flattener {sep!r}>", "exec"), namespace)
+    flattener: Flattener = namespace["flatten"]
+    flattener.__doc__ = source
+    return flattener
+
+
+def compile_flattener(sample: NestedMapping, *, sep: str = ".") -> Flattener:
+    """
+    Возвращает специализированную функцию преобразования для записей той же формы, что и `sample`.
+
+    В сгенерированной функции ключи и плоские ключи зашиты константами, а значения достаются прямыми обращениями
+    по ключу/индексу, без обхода уровней и форматирования ключей. Быстрый путь работает для записей из dict, list
+    и tuple той же формы; остальные записи (другие ключи или длины, вложенное значение вместо плоского и наоборот,
+    другие Mapping, set) обрабатываются `get_flat_dict_from_nested_mapping`, результат совпадает с ним как словарь
+    (порядок ключей - как в `sample`). Как и в отпечатке формы, ключи `1`, `1.0` и `True` не различаются.
+    Скомпилированные функции кэшируются (LRU) по отпечатку формы и `sep`.
+
+    :param sample: Пример записи или схема - вложенная структура, у которой значения листьев не важны
+        (например, `{"name": str, "address": {"zip": int}}`).
+    :param sep: Разделитель между уровнями вложенности. По умолчанию: `.`.
+    :return: Функция `record -> плоский словарь`.
+    """
+    fingerprint = (_get_shape_and_leaves(sample)[0], sep)
+    flattener = _compiled_flatteners.get(fingerprint)
+    if flattener is not None:
+        _compiled_flatteners.move_to_end(fingerprint)
+        return flattener
+
+    flattener = _build_flattener(sample, sep)
+    _compiled_flatteners[fingerprint] = flattener
+    if len(_compiled_flatteners) > COMPILED_FLATTENERS_MAXSIZE:
+        _compiled_flatteners.popitem(last=False)
+    return flattener
+
+
+def _is_index_keys(node: dict[str, Any]) -> bool:
+    """Ключи узла - ровно индексы `0..n-1` (в любом порядке)."""
+    size = len(node)
+    return bool(size) and "0" in node and str(size - 1) in node and all(str(i) in node for i in range(size))
+
+
+def unflatten(flat: Mapping[str, Any], *, sep: str = ".", lists: bool = True) -> dict[str, Any] | list[Any]:
+    """
+    Обратное к `get_flat_dict_from_nested_mapping`: собирает вложенную структуру из плоских ключей.
+
+    Узлы индексируются по префиксу ключа (`"a.b"` для `"a.b.c"`), поэтому общий префикс разбирается и ищется
+    один раз: на каждый ключ приходится одно `rpartition` и одно обращение к индексу, промежуточные узлы создаются
+    при первом появлении префикса. Уровни, ключи которых - ровно `0..n-1`, становятся списками.
+
+    :param flat: Плоский словарь.
+    :param sep: Разделитель между уровнями вложенности. По умолчанию: `.`.
+    :param lists: Собирать ли списки из числовых сегментов. По умолчанию: да.
+    :return: Вложенный словарь (или список, если ключи верхнего уровня - индексы).
+    """
+    root: dict[str, Any] = {}
+    # префикс ключа -> узел; корень не индексируется - у ключей верхнего уровня нет префикса
+    nodes: dict[str, dict[str, Any]] = {}
+    # (родитель, сегмент, узел) в порядке создания: родитель всегда создаётся раньше потомков
+    created: list[tuple[dict[str, Any], str, dict[str, Any]]] = []
+
+    for key, value in flat.items():
+        prefix, found, segment = key.rpartition(sep)
+        parent = nodes.get(prefix) if found else root
+        if parent is None:
+            # поднимаемся до ближайшего существующего предка и создаём недостающие узлы сверху вниз
+            missing: list[tuple[str, str]] = []
+            while parent is None:
+                parent_prefix, found, parent_segment = prefix.rpartition(sep)
+                missing.append((prefix, parent_segment))
+                parent = nodes.get(parent_prefix) if found else root
+                prefix = parent_prefix
+            for node_prefix, node_segment in reversed(missing):
+                if node_segment in parent:
+                    raise ValueError(f"Key {key!r} conflicts with value at {node_prefix!r}")
+                node: dict[str, Any] = {}
+                parent[node_segment] = node
+                nodes[node_prefix] = node
+                created.append((parent, node_segment, node))
+                parent = node
+
+        if segment in parent:
+            raise ValueError(f"Key {key!r} conflicts with nested keys under it")
+        parent[segment] = value
+
+    if not lists:
+        return root
+    for parent, segment, node in reversed(created):
+        if _is_index_keys(node):
+            parent[segment] = [node[str(i)] for i in range(len(node))]
+    return [root[str(i)] for i in range(len(root))] if _is_index_keys(root) else root
+
+
+def _iter_text_chunks(source: JsonSource, chunk_size: int) -> Iterator[str]:
+    """Режет источник на текстовые куски; байты декодируются инкрементально (кодировка как в `json.loads`)."""
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+        return
+
+    if isinstance(source, (bytes, bytearray)):
+        view = memoryview(source)
+        read: Iterator[str | bytes] = (
+            bytes(view[start : start + chunk_size]) for start in range(0, len(view), chunk_size)
+        )
+    else:
+        read = iter(lambda: source.read(chunk_size), source.read(0))
+
+    decoder: codecs.IncrementalDecoder | None = None
+    head = b""
+    for chunk in read:
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            # для определения кодировки (utf-8/16/32, BOM) нужны первые 4 байта
+            head += chunk
+            if len(head) < 4:
+                continue
+            decoder = codecs.getincrementaldecoder(json.detect_encoding(head))()
+            chunk, head = head, b""
+        yield decoder.decode(chunk)
+    if decoder is None and head:
+        decoder = codecs.getincrementaldecoder(json.detect_encoding(head))()
+        yield decoder.decode(head)
+    if decoder is not None:
+        yield decoder.decode(b"", final=True)
+
+
+def _find_closing_quote(text: str, start: int, escaped: bool) -> tuple[int, bool]:
+    """
+    Индекс первой неэкранированной `"` в `text[start:]` (-1, если её нет) и экранирован ли символ после `text`.
+
+    :param escaped: Экранирован ли `text[start]` (нечётное число `\\` в конце предыдущего куска).
+    """
+    pos = start
+    while (quote := text.find('"', pos)) >= 0:
+        run_start = quote
+        while run_start > start and text[run_start - 1] == "\\":
+            run_start -= 1
+        if (quote - run_start + (escaped and run_start == start)) % 2 == 0:
+            return quote, False
+        pos = quote + 1
+    run_start = len(text)
+    while run_start > start and text[run_start - 1] == "\\":
+        run_start -= 1
+    return -1, (len(text) - run_start + (escaped and run_start == start)) % 2 == 1
+
+
+class _JsonStream:
+    """Буфер над потоком текстовых кусков: хранит только ещё не разобранный хвост и один новый кусок."""
+
+    def __init__(self, chunks: Iterator[str]) -> None:
+        self._chunks = chunks
+        self._offset = 0
+        self.buf = ""
+        self.pos = 0
+
+    def fill(self) -> bool:
+        """Дочитывает следующий кусок. False - поток исчерпан."""
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self._offset += self.pos
+            self.buf = self.buf[self.pos :] + chunk
+            self.pos = 0
+            return True
+        return False
+
+    def error(self, msg: str) -> ValueError:
+        return ValueError(f"{msg}: char {self._offset + self.pos}")
+
+    def peek(self) -> str:
+        """Пропускает пробельные символы и возвращает следующий символ ('' - конец потока)."""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buf, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expecting {char!r} delimiter")
+        self.pos += 1
+
+    def read_string(self) -> str:
+        end, escaped = _find_closing_quote(self.buf, self.pos + 1, False)
+        if end < 0:
+            # длинная строка: куски копятся в списке до закрывающей кавычки и склеиваются один раз,
+            # иначе каждое дочитывание копировало бы весь уже прочитанный префикс строки
+            parts = [self.buf[self.pos :]]
+            for chunk in self._chunks:
+                parts.append(chunk)
+                end, escaped = _find_closing_quote(chunk, 0, escaped)
+                if end >= 0:
+                    break
+            else:
+                raise self.error("Unterminated string")
+            self._offset += self.pos
+            self.buf = "".join(parts)
+            self.pos = 0
+        try:
+            value: str
+            value, self.pos = scanstring(self.buf, self.pos + 1)
+        except json.JSONDecodeError as e:
+            raise self.error(e.msg) from None
+        return value
+
+    def read_scalar(self) -> Any:
+        char = self.peek()
+        if char == '"':
+            return self.read_string()
+
+        literal = _JSON_LITERALS.get(char)
+        if literal is not None:
+            text, value = literal
+            while len(self.buf) - self.pos < len(text) and self.fill():
+                pass
+            if self.buf.startswith(text, self.pos):
+                self.pos += len(text)
+                return value
+
+        while True:
+            match = NUMBER_RE.match(self.buf, self.pos)
+            # число (вместе с дробной частью и экспонентой) может быть разрезано границей куска
+            if match is None or match.end() + 2 < len(self.buf) or not self.fill():
+                break
+        if match is None:
+            raise self.error("Expecting value")
+        integer, frac, exp = match.groups()
+        self.pos = match.end()
+        return float(integer + (frac or "") + (exp or "")) if frac or exp else int(integer)
+
+
+def iter_flat_items_from_json(
+    source: JsonSource,
+    *,
+    sep: str = ".",
+    chunk_size: int = 64 * 1024,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Потоково разбирает JSON и отдаёт пары (плоский ключ, значение) по мере чтения.
+
+    Ключи и значения совпадают с `get_flat_dict_from_nested_mapping(json.load(source))`, но документ
+    не загружается в память целиком: хранится только стек вложенности и текущий кусок входа.
+
+    :param source: JSON-документ (объект или массив): str, bytes или файловый объект (текстовый или бинарный).
+    :param sep: Разделитель между уровнями вложенности. По умолчанию: `.`.
+    :param chunk_size: Размер куска, читаемого из источника за раз.
+    :return: Генератор пар (ключ, значение).
+    """
+    stream = _JsonStream(_iter_text_chunks(source, chunk_size))
+    # кадр стека: [ключ-префикс, это объект, количество уже прочитанных элементов]
+    stack: list[list[Any]] = []
+
+    char = stream.peek()
+    if char not in ("{", "["):
+        raise stream.error("Expecting object or array")
+    stream.pos += 1
+    stack.append(["", char == "{", 0])
+
+    while stack:
+        frame = stack[-1]
+        parent_key, is_object, count = frame
+        char = stream.peek()
+
+        if char == ("}" if is_object else "]"):
+            stream.pos += 1
+            stack.pop()
+            continue
+        if count:
+            if char != ",":
+                raise stream.error("Expecting ',' delimiter")
+            stream.pos += 1
+            char = stream.peek()
+
+        if is_object:
+            if char != '"':
+                raise stream.error("Expecting property name enclosed in double quotes")
+            key: Any = stream.read_string()
+            stream.expect(":")
+            char = stream.peek()
+        else:
+            key = count
+        frame[2] = count + 1
+
+        new_key = f"{parent_key}{sep}{key}" if parent_key else str(key)
+        if char in ("{", "["):
+            stream.pos += 1
+            stack.append([new_key, char == "{", 0])
+        else:
+            yield new_key, stream.read_scalar()
+
+    if stream.peek():
+        raise stream.error("Extra data")
+
+
 if __name__ == "__main__":
     print(get_flat_dict_from_nested_mapping({"a": {"b": "c"}}))
     print(get_flat_dict_from_nested_mapping({"a": [{"b": "c"}, {"d": "e"}]}))
     print(get_flat_dict_from_nested_mapping([{"a": [{"b": "c"}, {"d": "e"}]}]))
+    print(list(iter_flat_items_from_json('{"a": [{"b": "c"}, {"d": 1.5}]}')))
+    print(get_flat_columns_from_records([{"a": {"b": 1}}, {"a": {"b": 2}, "c": [3]}, {"a": {"b": 4}}]))
+    print(compile_flattener({"a": {"b": str}, "c": [int]})({"a": {"b": "x"}, "c": [1]}))
+    print(FlatView({"a": {"b": "c"}, "d": [1, 2]})["d.1"])
+    print(unflatten({"a.0.b": "c", "a.1.d": "e", "f": 1}))
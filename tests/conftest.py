@@ -0,0 +1,11 @@
+import pytest
+
+from snippets.decorators.events import DecoratorEvent, events
+
+
+@pytest.fixture
+def received():
+    received: list[DecoratorEvent] = []
+    unsubscribe = events.subscribe(received.append)
+    yield received
+    unsubscribe()
@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+
+
+def test_measure():
+    m = harness.measure(lambda: sum(range(100)), repeat=3, min_time=0.001)
+    assert m.q1 <= m.median <= m.q3 and m.number >= 1 and m.repeat == 3
+    with pytest.raises(ValueError):
+        harness.measure(lambda: None, repeat=1)
+
+
+def test_regression_requires_threshold_and_no_overlap():
+    base = harness.Measurement(1.0, 0.9, 1.1, 10, 7)
+    slower = harness.Measurement(1.3, 1.2, 1.4, 10, 7)
+    noisy = harness.Measurement(1.3, 1.0, 1.6, 10, 7)
+    (slow,), (noise,) = harness.compare({"a": base}, {"a": slower}), harness.compare({"a": base}, {"a": noisy})
+    assert slow.ratio == pytest.approx(1.3)
+    assert slow.is_regression(0.1) and not slow.is_regression(0.5)
+    assert not noise.is_regression(0.1), "overlapping IQR is noise"
+    assert harness.compare({"a": base}, {"b": base}) == []
+
+
+def test_compare_command(tmp_path, capsys):
+    base = {"x": harness.Measurement(1.0, 0.9, 1.1, 10, 7)}
+    harness.dump(base, str(tmp_path / "base.json"))
+    assert harness.load(str(tmp_path / "base.json")) == base
+    harness.dump({"x": harness.Measurement(2.0, 1.9, 2.1, 10, 7)}, str(tmp_path / "cur.json"))
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "base.json")]) == 0
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "cur.json")]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_compare_command_without_common_benchmarks(tmp_path, capsys):
+    base = {"x": harness.Measurement(1.0, 0.9, 1.1, 10, 7), "y": harness.Measurement(1.0, 0.9, 1.1, 10, 7)}
+    harness.dump(base, str(tmp_path / "base.json"))
+    harness.dump({"x": base["x"]}, str(tmp_path / "cur.json"))
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "cur.json")]) == 0
+    assert "y" in capsys.readouterr().out.split("MISSING")[0], "missing baseline entry not reported"
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "cur.json"), "-k", "y"]) == 2
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "cur.json"), "-k", "z"]) == 2
+
+
+def test_suite_benchmarks_run():
+    results = harness.run("patterns.*", repeat=2, warmup=0, min_time=0.001)
+    assert list(results) == ["patterns.builder.director"]
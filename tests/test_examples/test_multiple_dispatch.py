@@ -0,0 +1,106 @@
+from abc import ABC
+from collections.abc import Sequence
+
+import pytest
+
+from examples.dispatch import Biba, Buba
+from examples.multiple_dispatch import multidispatch, pay_salary
+
+
+class A:
+    pass
+
+
+class B(A):
+    pass
+
+
+class C(B):
+    pass
+
+
+def make():
+    @multidispatch
+    def func(x: object, y: object = None) -> str:
+        return "default"
+
+    return func
+
+
+def test_pay_salary():
+    biba, buba = Biba(1), Buba([])
+    pay_salary(biba, 2)
+    pay_salary(biba, "0.5")
+    pay_salary(buba, [1.0])
+    pay_salary(buba, 2.0)
+    assert biba.salary == 3.5
+    assert buba.salary == [1.0, 2.0]
+    with pytest.raises(NotImplementedError):
+        pay_salary(None, 10)
+
+
+def test_most_specific_wins():
+    func = make()
+    func.register(A, A)(lambda x, y: "AA")
+    func.register(B, A)(lambda x, y: "BA")
+    func.register(B, B)(lambda x, y: "BB")
+    assert func(A(), A()) == "AA"
+    assert func(C(), A()) == "BA"
+    assert func(C(), C()) == "BB"
+    assert func(1, A()) == "default"
+    assert func(A()) == "default", "too few arguments fall back to the default"
+
+
+def test_mro_distance_and_ambiguity():
+    func = make()
+    func.register(C, A)(lambda x, y: "CA")
+    func.register(A, B)(lambda x, y: "AB")
+    assert func(C(), B()) == "CA", "MRO distance 0 + 1 is shorter than 2 + 0"
+    func2 = make()
+    func2.register(C, object)(lambda x, y: "C*")
+    func2.register(object, C)(lambda x, y: "*C")
+    with pytest.raises(TypeError, match="Ambiguous"):
+        func2(C(), C())
+
+
+def test_registration_by_annotations_and_union():
+    func = make()
+
+    @func.register()
+    def _(x: int | str, y: float) -> str:
+        return "number"
+
+    assert set(func.registry) == {(int, float), (str, float)}
+    assert func(1, 1.0) == func("1", 1.0) == "number"
+    with pytest.raises(TypeError):
+        func.register(int)(lambda x: x)
+
+
+def test_cache_invalidated_on_register():
+    func = make()
+    func.register(A, A)(lambda x, y: "AA")
+    assert func(B(), B()) == "AA"
+    func.register(B, B)(lambda x, y: "BB")
+    assert func(B(), B()) == "BB"
+
+
+def test_cache_invalidated_on_abc_register():
+    class Shape(ABC):
+        pass
+
+    class Square:
+        pass
+
+    func = make()
+    func.register(Shape, object)(lambda x, y: "shape")
+    assert func(Square(), 1) == "default"
+    Shape.register(Square)
+    assert func(Square(), 1) == "shape"
+
+
+def test_virtual_abc_distance():
+    func = make()
+    func.register(Sequence, object)(lambda x, y: "sequence")
+    func.register(object, int)(lambda x, y: "int")
+    assert func([], "1") == "sequence"
+    assert func([], 1) == "int", "Sequence is placed after list in its MRO: 0.5 + 1 is longer than 1 + 0"
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from snippets.context_managers.async_browser_context_manager import Browser
+from snippets.context_managers.browser_pool import BrowserPool
+
+
+class FastBrowser(Browser):
+    opened: list["FastBrowser"] = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def find(self, query: str) -> str:
+        FastBrowser.in_flight += 1
+        FastBrowser.max_in_flight = max(FastBrowser.max_in_flight, FastBrowser.in_flight)
+        await asyncio.sleep(0.01)
+        FastBrowser.in_flight -= 1
+        return f"{query} on {id(self)}"
+
+    async def __aenter__(self) -> "FastBrowser":
+        FastBrowser.opened.append(self)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def reset_browsers():
+    FastBrowser.opened = []
+    FastBrowser.in_flight = FastBrowser.max_in_flight = 0
+
+
+def make_pool(**kwargs) -> BrowserPool:
+    return BrowserPool(factory=lambda: FastBrowser("Chrome"), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_find_many_reuses_browsers_with_bounded_concurrency():
+    async with make_pool(max_size=4) as pool:
+        results = await pool.find_many([str(i) for i in range(20)], concurrency=2)
+    assert [r.split()[0] for r in results] == [str(i) for i in range(20)], "results order fail"
+    assert len(FastBrowser.opened) == 2, "browsers must be reused"
+    assert FastBrowser.max_in_flight == 2, "concurrency limit fail"
+    assert all(browser.closed for browser in FastBrowser.opened), "pool must close browsers"
+
+
+@pytest.mark.asyncio
+async def test_min_size_and_acquire_timeout():
+    async with make_pool(min_size=1, max_size=1) as pool:
+        assert pool.size == pool.idle == 1
+        async with pool.acquire():
+            with pytest.raises(TimeoutError):
+                async with pool.acquire(timeout=0.05):
+                    pass
+            assert pool.size == 1 and pool.in_use == 1
+        assert pool.idle == 1 and pool.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_health_check_replaces_broken_browser():
+    async with make_pool(max_size=1) as pool:
+        async with pool.acquire() as browser:
+            pass
+        browser.closed = True
+        async with pool.acquire() as new_browser:
+            assert new_browser is not browser
+        assert pool.size == 1 and len(FastBrowser.opened) == 2
+
+
+@pytest.mark.asyncio
+async def test_idle_eviction_keeps_min_size():
+    async with make_pool(min_size=1, max_size=3, max_idle_sec=0.05) as pool:
+        await pool.find_many(["a", "b", "c"])
+        assert pool.size == 3
+        await asyncio.sleep(0.2)
+        assert pool.size == pool.idle == 1, "idle browsers over min_size must be closed"
+
+
+@pytest.mark.asyncio
+async def test_graceful_drain():
+    pool = make_pool(max_size=2)
+    await pool.start()
+    acquired = asyncio.Event()
+
+    async def hold() -> None:
+        async with pool.acquire():
+            acquired.set()
+            await asyncio.sleep(0.1)
+
+    holder = asyncio.create_task(hold())
+    await acquired.wait()
+    await pool.find("idle")
+    await pool.close()
+    assert holder.done(), "close must wait for browsers in use"
+    assert pool.size == 0 and all(browser.closed for browser in FastBrowser.opened)
+    with pytest.raises(RuntimeError):
+        async with pool.acquire():
+            pass
+
+
+@pytest.mark.asyncio
+async def test_waiters_fail_on_close():
+    pool = make_pool(max_size=1)
+    async with pool.acquire():
+        waiter = asyncio.create_task(pool.find("x"))
+        await asyncio.sleep(0.01)
+        closing = asyncio.create_task(pool.close())
+        with pytest.raises(RuntimeError):
+            await waiter
+    await closing
+
+
+@pytest.mark.asyncio
+async def test_failed_start_closes_opened_browsers():
+    attempts = 0
+
+    def factory() -> FastBrowser:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 2:
+            raise OSError("browser crashed")
+        return FastBrowser("Chrome")
+
+    pool = BrowserPool(min_size=2, factory=factory)
+    with pytest.raises(BaseExceptionGroup):
+        async with pool:
+            pass
+    assert len(FastBrowser.opened) == 1 and FastBrowser.opened[0].closed, "opened browsers must be closed"
+    assert pool.size == pool.idle == 0
+    assert pool._evictor is None, "evictor must not outlive a failed start"
+
+
+def test_pool_validation():
+    with pytest.raises(ValueError):
+        BrowserPool(min_size=2, max_size=1)
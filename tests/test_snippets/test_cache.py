@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from snippets.decorators.cache_decorator import memoize
+
+
+def test_sync_memoize_and_stats():
+    calls = []
+
+    @memoize()
+    def func(a: int, b: int = 0, *, c: int = 0) -> int:
+        calls.append((a, b, c))
+        return a + b + c
+
+    assert func(1, c=2, b=3) == func(1, b=3, c=2) == 6, "kwargs order must not matter"
+    assert func(1) == 1
+    assert calls == [(1, 3, 2), (1, 0, 0)]
+    info = func.cache_info()
+    assert (info.hits, info.misses, info.size) == (1, 2, 2)
+    func.cache_clear()
+    func(1)
+    assert len(calls) == 3 and func.cache_info().size == 1
+
+
+def test_lru_and_typed():
+    calls = []
+
+    @memoize(maxsize=2, typed=True)
+    def func(x: float) -> float:
+        calls.append(x)
+        return x
+
+    func(1)
+    func(1.0)
+    assert calls == [1, 1.0], "typed keys must differ"
+    func(1)
+    func(2)  # вытесняет 1.0
+    func(1.0)
+    assert calls == [1, 1.0, 2, 1.0]
+    assert func.cache_info().evictions == 2
+
+
+def test_ttl():
+    calls = []
+
+    @memoize(ttl_sec=0.05)
+    def func() -> int:
+        calls.append(None)
+        return len(calls)
+
+    assert func() == func() == 1
+    time.sleep(0.06)
+    assert func() == 2, "expired entry must be recomputed"
+
+
+def test_max_bytes():
+    @memoize(maxsize=None, max_bytes=100, size_of=len)
+    def func(n: int) -> bytes:
+        return bytes(n)
+
+    func(40)
+    func(50)
+    assert func.cache_info().bytes == 90
+    func(30)  # вытесняет 40
+    info = func.cache_info()
+    assert (info.size, info.bytes, info.evictions) == (2, 80, 1)
+    func(200)
+    assert func.cache_info().size == 2, "oversized value must not be cached"
+
+
+def test_exceptions_not_cached():
+    calls = []
+
+    @memoize()
+    def func() -> None:
+        calls.append(None)
+        raise ValueError
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            func()
+    assert len(calls) == 2
+
+
+def test_threads_share_cache():
+    @memoize()
+    def func(x: int) -> int:
+        return x * 2
+
+    threads = [threading.Thread(target=lambda: [func(i % 10) for i in range(1000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = func.cache_info()
+    assert info.size == 10 and info.hits + info.misses == 4000
+
+
+@pytest.mark.asyncio
+async def test_async_in_flight_dedup():
+    calls = []
+
+    @memoize()
+    async def func(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        return x * 2
+
+    assert await asyncio.gather(func(1), func(1), func(2), func(1)) == [2, 2, 4, 2]
+    assert calls == [1, 2]
+    assert await func(1) == 2
+    info = func.cache_info()
+    assert (info.hits, info.misses, info.coalesced) == (1, 4, 2)
+
+
+@pytest.mark.asyncio
+async def test_async_cancel_and_errors():
+    calls = []
+
+    @memoize()
+    async def func(fail: bool) -> int:
+        calls.append(fail)
+        await asyncio.sleep(0.05)
+        if fail:
+            raise LookupError
+        return 1
+
+    first = asyncio.create_task(func(False))
+    second = asyncio.create_task(func(False))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == 1, "cancelling one waiter must not cancel the shared call"
+    results = await asyncio.gather(func(True), func(True), return_exceptions=True)
+    assert all(isinstance(r, LookupError) for r in results)
+    with pytest.raises(LookupError):
+        await func(True)
+    assert calls == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_call_after_last_waiter_cancelled_starts_new_one():
+    calls = []
+
+    @memoize()
+    async def func(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.02)
+        return x
+
+    first = asyncio.create_task(func(1))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    await asyncio.sleep(0)  # отмена общего вызова ещё не завершилась
+    assert await func(1) == 1, "a new caller must not inherit someone else's cancellation"
+    assert first.cancelled() and calls == [1, 1]
+
+
+def test_validation():
+    with pytest.raises(ValueError):
+        memoize(maxsize=0)
@@ -0,0 +1,206 @@
+import array
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from snippets.chunks import (
+    achunked,
+    chunked,
+    chunked_by_bytes,
+    chunked_slices,
+    get_file_ranges,
+    iter_file_range,
+    parallel_map_chunks,
+    parallel_map_file_chunks,
+)
+
+
+@pytest.mark.parametrize("items", [[1, 2, 3, 4, 5], (1, 2, 3, 4, 5), iter([1, 2, 3, 4, 5]), range(1, 6)])
+def test_chunked(items):
+    assert list(chunked(items, 2)) == [[1, 2], [3, 4], [5]], "chunked fail"
+
+
+def test_chunked_invalid_size():
+    with pytest.raises(ValueError):
+        list(chunked([1], 0))
+
+
+@pytest.mark.parametrize("buffer", [b"abcde", bytearray(b"abcde"), memoryview(b"abcde")])
+def test_chunked_slices_buffer_zero_copy(buffer):
+    chunks = list(chunked_slices(buffer, 2))
+    assert all(isinstance(chunk, memoryview) for chunk in chunks), "slices not memoryview"
+    assert [bytes(chunk) for chunk in chunks] == [b"ab", b"cd", b"e"], "slices buffer fail"
+
+
+def test_chunked_slices_shares_memory():
+    buffer = bytearray(b"abcd")
+    first, _ = chunked_slices(buffer, 2)
+    buffer[0] = ord("z")
+    assert bytes(first) == b"zb", "slices copied buffer"
+
+
+def test_chunked_slices_sequences():
+    assert list(chunked_slices((1, 2, 3), 2)) == [(1, 2), (3,)], "slices tuple fail"
+    assert list(chunked_slices("abc", 2)) == ["ab", "c"], "slices str fail"
+    assert list(chunked_slices(iter([1, 2, 3]), 2)) == [[1, 2], [3]], "slices iterator fail"
+    assert list(chunked_slices(array.array("q", [1, 2, 3]), 2)) == [array.array("q", [1, 2]), array.array("q", [3])]
+
+
+@pytest.mark.parametrize("make_items", [list, iter])
+def test_chunked_by_bytes_items(make_items):
+    items = make_items([b"ab", b"cde", b"f", b"ghijk", b"", b"l"])
+    chunks = [list(chunk) for chunk in chunked_by_bytes(items, 4)]
+    assert chunks == [[b"ab"], [b"cde", b"f"], [b"ghijk"], [b"", b"l"]], "by bytes items fail"
+
+
+def test_chunked_by_bytes_buffer():
+    chunks = list(chunked_by_bytes(array.array("i", range(5)), 9))
+    assert [chunk.nbytes for chunk in chunks] == [8, 8, 4], "by bytes buffer fail"
+    assert [bytes(chunk) for chunk in chunked_by_bytes(b"abcde", 2)] == [b"ab", b"cd", b"e"], "by bytes bytes fail"
+
+
+def _slow_sum(chunk: list[int]) -> int:
+    time.sleep(0.01 * (chunk[0] % 3))
+    return sum(chunk)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_map_chunks_ordered(executor):
+    results = parallel_map_chunks(_slow_sum, range(20), 3, executor=executor, max_workers=2)
+    assert list(results) == [sum(chunk) for chunk in chunked(range(20), 3)], "parallel ordered fail"
+
+
+def test_parallel_map_chunks_unordered():
+    results = list(parallel_map_chunks(_slow_sum, range(20), 3, max_workers=4, ordered=False))
+    assert sorted(results) == sorted(sum(chunk) for chunk in chunked(range(20), 3)), "parallel unordered fail"
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_map_chunks_backpressure(ordered):
+    consumed = itertools.count()
+    items = (next(consumed) for _ in itertools.repeat(None))
+    results = parallel_map_chunks(len, items, 10, max_workers=2, max_in_flight=3, ordered=ordered)
+    assert list(itertools.islice(results, 5)) == [10] * 5, "parallel infinite input fail"
+    results.close()
+    assert next(consumed) <= (5 + 3) * 10, "parallel read too far ahead"
+
+
+def test_parallel_map_chunks_error():
+    def fail_on_second(chunk: list[int]) -> int:
+        if chunk[0] == 2:
+            raise KeyError("boom")
+        return sum(chunk)
+
+    results = parallel_map_chunks(fail_on_second, range(10), 2)
+    assert next(results) == 1, "parallel first result fail"
+    with pytest.raises(KeyError, match="boom"):
+        list(results)
+
+
+def test_parallel_map_chunks_external_executor():
+    with ThreadPoolExecutor(2) as executor:
+        assert list(parallel_map_chunks(sum, range(6), 2, executor=executor)) == [1, 5, 9], "parallel executor fail"
+        assert executor.submit(threading.get_ident).result(), "external executor was shut down"
+
+
+async def _produce(delays: list[float], error: Exception | None = None):
+    for i, delay in enumerate(delays):
+        await asyncio.sleep(delay)
+        yield i
+    if error is not None:
+        raise error
+
+
+@pytest.mark.asyncio
+async def test_achunked_by_size():
+    batches = [batch async for batch in achunked(_produce([0] * 7), 3)]
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]], "achunked by size fail"
+
+
+@pytest.mark.asyncio
+async def test_achunked_by_max_wait():
+    batches = [batch async for batch in achunked(_produce([0, 0, 0.15, 0, 0.15]), 10, max_wait=0.05)]
+    assert batches == [[0, 1], [2, 3], [4]], "achunked by max_wait fail"
+
+
+@pytest.mark.asyncio
+async def test_achunked_flushes_before_source_error():
+    batches = []
+    with pytest.raises(KeyError):
+        async for batch in achunked(_produce([0, 0], error=KeyError("boom")), 10):
+            batches.append(batch)
+    assert batches == [[0, 1]], "achunked error flush fail"
+
+
+@pytest.mark.asyncio
+async def test_achunked_cancel_propagates():
+    batches = []
+
+    async def consume() -> None:
+        async for batch in achunked(_produce([0, 0, 10]), 10):
+            batches.append(batch)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert batches == [], "achunked must not yield on cancel"
+
+
+@pytest.mark.asyncio
+async def test_achunked_timeout_around_anext():
+    batches = achunked(_produce([0, 0, 10]), 10)
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.05):
+            await anext(batches)
+    with pytest.raises(StopAsyncIteration):
+        await anext(batches)
+
+
+@pytest.fixture
+def lines_file(tmp_path):
+    path = tmp_path / "lines.log"
+    path.write_bytes(b"".join(f"line {i} {'x' * (i % 7)}\n".encode() for i in range(1000)) + b"tail without newline")
+    return path
+
+
+@pytest.mark.parametrize("parts", [1, 3, 8, 5000])
+def test_file_ranges_aligned(lines_file, parts):
+    ranges = get_file_ranges(lines_file, parts)
+    assert ranges[0][0] == 0 and ranges[-1][1] == lines_file.stat().st_size, "file ranges bounds fail"
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:])), "file ranges gaps"
+    lines = [line for start, end in ranges for line in iter_file_range(lines_file, start, end)]
+    assert lines == lines_file.read_bytes().splitlines(keepends=True), "file ranges not aligned"
+
+
+def test_file_ranges_empty(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_bytes(b"")
+    assert get_file_ranges(path, 4) == [], "file ranges empty fail"
+    assert list(parallel_map_file_chunks(len, path, 10)) == [], "parallel file empty fail"
+
+
+def test_parallel_map_file_chunks(lines_file):
+    results = list(parallel_map_file_chunks(len, lines_file, 100, processes=3))
+    assert sum(results) == 1001 and all(0 < count <= 100 for count in results), "parallel file chunks fail"
+
+
+def test_parallel_map_file_chunks_small_ranges(lines_file):
+    results = list(parallel_map_file_chunks(b"".join, lines_file, 100, processes=2, range_bytes=500, max_in_flight=2))
+    assert b"".join(results) == lines_file.read_bytes(), "parallel file chunks order fail"
+    assert len(results) > lines_file.stat().st_size // 500, "file must be split into small ranges"
+    with pytest.raises(ValueError):
+        list(parallel_map_file_chunks(len, lines_file, 100, range_bytes=0))
+
+
+def test_file_ranges_custom_delimiter(tmp_path):
+    path = tmp_path / "records.bin"
+    path.write_bytes(b"a;bb;ccc;dddd;e")
+    ranges = get_file_ranges(path, 3, delimiter=b";")
+    records = [record for start, end in ranges for record in iter_file_range(path, start, end, delimiter=b";")]
+    assert records == [b"a;", b"bb;", b"ccc;", b"dddd;", b"e"], "file ranges custom delimiter fail"
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from snippets.context_managers.concurrent_exit_stack import ConcurrentExitStack
+
+
+class Resource:
+    def __init__(
+        self, name: str, log: list[str], *, delay: float = 0.05, fail_enter: bool = False, fail_exit: bool = False
+    ):
+        self.name = name
+        self.log = log
+        self.delay = delay
+        self.fail_enter = fail_enter
+        self.fail_exit = fail_exit
+
+    async def __aenter__(self) -> str:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.log.append(f"cancelled {self.name}")
+            raise
+        if self.fail_enter:
+            raise ConnectionError(self.name)
+        self.log.append(f"enter {self.name}")
+        return self.name
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await asyncio.sleep(self.delay)
+        self.log.append(f"exit {self.name} {exc_type and exc_type.__name__}")
+        if self.fail_exit:
+            raise OSError(self.name)
+
+
+@pytest.mark.asyncio
+async def test_enter_and_exit_concurrently():
+    log: list[str] = []
+    started = time.monotonic()
+    async with ConcurrentExitStack() as stack:
+        values = await stack.enter_all(Resource(str(i), log, delay=0.1) for i in range(5))
+        assert values == ["0", "1", "2", "3", "4"]
+    assert time.monotonic() - started < 0.4, "enter and exit must run concurrently"
+    assert sorted(log) == sorted([f"enter {i}" for i in range(5)] + [f"exit {i} None" for i in range(5)])
+
+
+@pytest.mark.asyncio
+async def test_failed_enter_unwinds_only_entered():
+    log: list[str] = []
+    stack = ConcurrentExitStack()
+    managers = [
+        Resource("fast", log, delay=0.01),
+        Resource("bad", log, delay=0.02, fail_enter=True),
+        Resource("slow", log, delay=1),
+    ]
+    with pytest.raises(ExceptionGroup) as exc_info:
+        await stack.enter_all(managers)
+    assert [type(e) for e in exc_info.value.exceptions] == [ConnectionError]
+    assert log == ["enter fast", "cancelled slow", "exit fast None"]
+    await stack.aclose()
+    assert len(log) == 3, "unwound managers must not be exited again"
+
+
+@pytest.mark.asyncio
+async def test_exit_errors_collected():
+    log: list[str] = []
+    with pytest.raises(ExceptionGroup) as exc_info:
+        async with ConcurrentExitStack() as stack:
+            await stack.enter_all(
+                [Resource("a", log, fail_exit=True), Resource("b", log), Resource("c", log, fail_exit=True)]
+            )
+            raise KeyError("body")
+    assert sorted(str(e) for e in exc_info.value.exceptions) == ["a", "c"]
+    assert isinstance(exc_info.value.__context__, KeyError)
+    assert {entry for entry in log if entry.startswith("exit")} == {
+        "exit a KeyError",
+        "exit b KeyError",
+        "exit c KeyError",
+    }
+
+
+@pytest.mark.asyncio
+async def test_cancel_during_enter_unwinds():
+    log: list[str] = []
+    stack = ConcurrentExitStack()
+    task = asyncio.create_task(stack.enter_all([Resource("fast", log, delay=0.01), Resource("slow", log, delay=1)]))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert log == ["enter fast", "cancelled slow", "exit fast None"]
+
+
+@pytest.mark.asyncio
+async def test_generator_managers():
+    closed = []
+
+    @asynccontextmanager
+    async def resource(i: int):
+        yield i
+        closed.append(i)
+
+    async with ConcurrentExitStack() as stack:
+        assert await stack.enter_all(resource(i) for i in range(3)) == [0, 1, 2]
+        assert await stack.enter_all([resource(3)]) == [3]
+    assert sorted(closed) == [0, 1, 2, 3]
@@ -0,0 +1,109 @@
+import logging
+
+import pytest
+import structlog
+
+from snippets.decorators.events import (
+    DecoratorEvent,
+    EventBus,
+    EventKind,
+    LoggingSink,
+    StructlogSink,
+    format_event,
+)
+from snippets.decorators.retry_decorator import retry
+from snippets.decorators.timer_decorator import timeit_async, timeit_sync
+
+
+def test_bus_subscribe_unsubscribe():
+    bus = EventBus()
+    assert not bus, "empty bus must be falsy"
+    received: list[DecoratorEvent] = []
+    unsubscribe = bus.subscribe(received.append)
+    assert bus
+    bus.emit(DecoratorEvent(EventKind.CALL, "f", 0.1))
+    unsubscribe()
+    bus.emit(DecoratorEvent(EventKind.CALL, "f", 0.1))
+    assert len(received) == 1 and not bus
+
+
+def test_no_events_without_sinks(capfd):
+    @timeit_sync
+    def func() -> int:
+        return 1
+
+    assert func() == 1
+    assert capfd.readouterr().out == "", "decorators must not print by default"
+
+
+def test_timer_events(received):
+    @timeit_sync
+    def func(fail: bool) -> None:
+        if fail:
+            raise KeyError("k")
+
+    func(False)
+    with pytest.raises(KeyError):
+        func(True)
+    assert [(e.kind, e.exc_type) for e in received] == [(EventKind.CALL, None), (EventKind.CALL, KeyError)]
+    assert received[0].func.endswith("func") and received[0].elapsed_sec >= 0
+
+
+@pytest.mark.asyncio
+async def test_async_timer_events(received):
+    @timeit_async
+    async def func() -> int:
+        return 1
+
+    assert await func() == 1
+    assert [e.kind for e in received] == [EventKind.CALL]
+
+
+def test_retry_events(received):
+    calls = []
+
+    @retry(count=3, delay_sec=0.01)
+    def func() -> int:
+        calls.append(None)
+        if len(calls) < 2:
+            raise ValueError("v")
+        return 1
+
+    func()
+    assert [(e.kind, e.attempt, e.exc_type) for e in received] == [
+        (EventKind.RETRY, 1, ValueError),
+        (EventKind.SUCCESS, 2, None),
+    ]
+    assert received[0].delay_sec == 0.01
+    received.clear()
+    retry(count=1)(lambda: 1 / 0)()
+    assert [(e.kind, e.attempt, e.exc_type) for e in received] == [(EventKind.FAILURE, 1, ZeroDivisionError)]
+
+
+def test_format_event():
+    event = DecoratorEvent(EventKind.CALL, "f", 0.5)
+    assert format_event(event) == "Function `f` took 0.5000 seconds"
+
+
+def test_logging_sink(caplog):
+    sink = LoggingSink()
+    with caplog.at_level(logging.INFO, logger="snippets.decorators"):
+        sink(DecoratorEvent(EventKind.RETRY, "f", 0.25, 1, ValueError("v"), 0.1))
+    assert caplog.messages == ["retry f attempt=1 elapsed=0.2500 exc_type=ValueError memory=None"]
+
+
+def test_structlog_sink():
+    with structlog.testing.capture_logs() as logs:
+        StructlogSink()(DecoratorEvent(EventKind.FAILURE, "f", 0.25, 3, ValueError("v")))
+    assert logs == [
+        {
+            "event": "failure",
+            "func": "f",
+            "attempt": 3,
+            "elapsed_sec": 0.25,
+            "exc_type": "ValueError",
+            "delay_sec": None,
+            "memory": None,
+            "log_level": "info",
+        }
+    ]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from snippets.context_managers.find_cache import CachedFinder
+
+
+class CountingFinder:
+    def __init__(self, delay: float = 0.05, fail: bool = False) -> None:
+        self.calls: list[str] = []
+        self.cancelled = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def find(self, query: str) -> str:
+        self.calls.append(query)
+        number = len(self.calls)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise LookupError(query)
+        return f"result {query} #{number}"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_and_hits():
+    source = CountingFinder()
+    finder = CachedFinder(source)
+    results = await asyncio.gather(*(finder.find(q) for q in ["a", "a", "b", "a"]))
+    assert results == ["result a #1", "result a #1", "result b #2", "result a #1"]
+    assert source.calls == ["a", "b"], "concurrent misses must share one search"
+    assert await finder.find("a") == "result a #1"
+    stats = finder.stats
+    assert (stats.hits, stats.misses, stats.coalesced, stats.size) == (1, 4, 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_ttl_and_lru():
+    source = CountingFinder(delay=0)
+    finder = CachedFinder(source, maxsize=2, ttl_sec=0.05)
+    await finder.find("a")
+    await finder.find("b")
+    await finder.find("a")
+    await finder.find("c")  # вытесняет b - давно не использованный
+    assert finder.stats.size == 2
+    await finder.find("a")
+    await finder.find("b")
+    assert source.calls == ["a", "b", "c", "b"], "LRU eviction fail"
+    await asyncio.sleep(0.06)
+    await finder.find("a")
+    assert source.calls[-1] == "a", "expired entry must be refreshed"
+
+
+@pytest.mark.asyncio
+async def test_errors_not_cached_and_shared():
+    source = CountingFinder(fail=True)
+    finder = CachedFinder(source)
+    results = await asyncio.gather(finder.find("x"), finder.find("x"), return_exceptions=True)
+    assert all(isinstance(r, LookupError) for r in results) and len(source.calls) == 1
+    source.fail = False
+    assert await finder.find("x") == "result x #2", "errors must not be cached"
+
+
+@pytest.mark.asyncio
+async def test_cancel_one_waiter_keeps_search():
+    source = CountingFinder()
+    finder = CachedFinder(source)
+    first = asyncio.create_task(finder.find("q"))
+    second = asyncio.create_task(finder.find("q"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "result q #1"
+    assert first.cancelled() and source.cancelled == 0
+    assert finder.stats.size == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_all_waiters_cancels_search():
+    source = CountingFinder()
+    finder = CachedFinder(source)
+    waiter = asyncio.create_task(finder.find("q"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.sleep(0.01)
+    assert source.cancelled == 1 and finder.stats.size == 0
+    assert await finder.find("q") == "result q #2", "cancelled search must not block new ones"
+
+
+@pytest.mark.asyncio
+async def test_clear_drops_in_flight_result():
+    source = CountingFinder()
+    finder = CachedFinder(source)
+    task = asyncio.create_task(finder.find("q"))
+    await asyncio.sleep(0.01)
+    finder.clear()
+    assert await task == "result q #1"
+    assert finder.stats.size == 0
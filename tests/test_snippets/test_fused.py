@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from snippets.decorators.events import DecoratorEvent, EventKind
+from snippets.decorators.fused_decorator import Limited, Retry, Timed, Traced, fused
+from snippets.decorators.limit_decorator import ConcurrencyLimiter, limited
+from snippets.decorators.retry_decorator import CircuitBreaker, RetryPolicy, retry
+from snippets.decorators.timer_decorator import timeit_async, timeit_sync
+from snippets.decorators.tracing import traced, tracer
+
+
+@pytest.fixture(autouse=True)
+def clear_tracer():
+    tracer.clear()
+
+
+def flaky(fail_times: int):
+    calls = 0
+
+    def func(x: int) -> int:
+        nonlocal calls
+        calls += 1
+        if calls <= fail_times:
+            raise ValueError("flaky")
+        return x * 2
+
+    return func
+
+
+def summary(received: list[DecoratorEvent]) -> list[tuple[EventKind, int | None, type[BaseException] | None]]:
+    return [(event.kind, event.attempt, event.exc_type) for event in received]
+
+
+@pytest.mark.parametrize("fail_times", [0, 2, 5])
+def test_sync_fused_matches_nested(received, fail_times):
+    nested = retry(count=3, delay_sec=0)(timeit_sync(trace=True)(traced(flaky(fail_times))))
+    fused_func = fused(Retry(count=3, delay_sec=0), Timed(trace=True), Traced())(flaky(fail_times))
+
+    expected = nested(21)
+    nested_events, nested_spans = summary(received), len(tracer.finished)
+    received.clear()
+    tracer.clear()
+    assert fused_func(21) == expected == (None if fail_times >= 3 else 42)
+    assert summary(received) == nested_events
+    assert len(tracer.finished) == nested_spans
+
+
+def test_timed_outside_retry(received):
+    fused_func = fused(Timed(), Retry(count=2, delay_sec=0))(flaky(5))
+    assert fused_func(1) is None
+    assert [event.kind for event in received] == [EventKind.RETRY, EventKind.FAILURE, EventKind.CALL]
+    assert received[-1].exc is None, "retry swallows the error, so the outer timer sees a normal return"
+
+
+def test_exceptions_propagate_and_wraps(received):
+    @fused(Timed(), Traced())
+    def fail() -> None:
+        """Документация."""
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        fail()
+    assert fail.__name__ == "fail" and fail.__doc__ == "Документация."
+    assert received[-1].kind is EventKind.CALL and received[-1].exc_type is KeyError
+    assert "def fused" in fail.__fused_source__  # type: ignore[attr-defined]
+
+
+def test_policy_rejects(received):
+    policy = RetryPolicy(breaker=CircuitBreaker(failure_threshold=1, reset_timeout_sec=60))
+    fused_func = fused(Retry(count=1, policy=policy), Timed())(flaky(5))
+    assert fused_func(1) is None
+    assert fused_func(1) is None
+    assert [event.kind for event in received] == [EventKind.CALL, EventKind.FAILURE, EventKind.REJECTED]
+
+
+def test_async_fused_matches_nested(received):
+    def make(fail_times: int):
+        calls = 0
+
+        async def func(x: int) -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            if calls <= fail_times:
+                raise ValueError("flaky")
+            return x
+
+        return func
+
+    limiter = ConcurrencyLimiter(1)
+    nested = retry(count=3, delay_sec=0)(timeit_async(limited(limiter)(make(1))))
+    fused_func = fused(Retry(count=3, delay_sec=0), Timed(), Limited(limiter))(make(1))
+
+    async def main(func) -> list[int | None]:
+        return await asyncio.gather(func(1), func(2))
+
+    expected = asyncio.run(main(nested))
+    nested_events = summary(received)
+    received.clear()
+    assert asyncio.run(main(fused_func)) == expected == [1, 2]
+    assert summary(received) == nested_events
+    assert limiter.in_use == 0
+
+
+def test_async_deadline():
+    @fused(Retry(count=3, delay_sec=0, deadline_sec=0.05))
+    async def slow() -> int:
+        await asyncio.sleep(1)
+        return 1
+
+    assert asyncio.run(slow()) is None
+
+
+def test_invalid_retry_count():
+    with pytest.raises(ValueError):
+        Retry(count=0)
+
+
+def test_cancelled_probe_releases_half_open_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=0)
+    breaker.record_failure()
+
+    @fused(Retry(count=1, policy=RetryPolicy(breaker=breaker)), Timed())
+    async def call() -> None:
+        await asyncio.sleep(1)
+
+    async def main() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(call(), 0.01)
+
+    asyncio.run(main())
+    assert breaker.allow(), "cancelled probe must give its slot back"
+
+
+def test_interrupted_non_probe_keeps_half_open_limit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=0)
+
+    @fused(Retry(count=1, policy=RetryPolicy(breaker=breaker)))
+    async def call() -> None:
+        await asyncio.sleep(1)
+
+    async def main() -> None:
+        closed_call = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        breaker.record_failure()
+        probe = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        closed_call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await closed_call
+        assert not breaker.allow(), "call admitted in closed state must not free the probe slot"
+        probe.cancel()
+
+    asyncio.run(main())
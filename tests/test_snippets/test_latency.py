@@ -0,0 +1,69 @@
+import json
+import random
+
+import pytest
+
+from snippets.decorators.latency import HistogramRegistry, LatencyHistogram, latencies
+from snippets.decorators.timer_decorator import timeit_async, timeit_sync
+
+
+def test_histogram_percentiles_relative_error():
+    rnd = random.Random(42)
+    values = sorted(rnd.lognormvariate(-7, 1.5) for _ in range(20000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    snap = histogram.snapshot()
+    assert snap.count == len(values)
+    assert snap.min_sec == values[0] and snap.max_sec == values[-1]
+    assert snap.sum_sec == pytest.approx(sum(values))
+    for q, value in snap.quantiles().items():
+        expected = values[max(0, int(q * len(values)) - 1)]
+        assert value == pytest.approx(expected, rel=1 / 32), f"p{q} fail"
+
+
+def test_histogram_edge_values():
+    histogram = LatencyHistogram(max_value_sec=1)
+    for value in (0.0, -1.0, 1e-10, 5000.0):
+        histogram.record(value)
+    snap = histogram.snapshot()
+    assert snap.count == 4 and snap.max_sec == 5000.0 and snap.p999 == 5000.0
+    assert histogram.snapshot(reset=True).count == 4
+    assert histogram.snapshot().count == 0, "snapshot reset fail"
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().snapshot().p99 == 0.0
+
+
+def test_registry_export():
+    registry = HistogramRegistry()
+    assert registry.get('f"n') is registry.get('f"n')
+    registry.get('f"n').record(0.5)
+    data = json.loads(registry.to_json())
+    assert data['f"n']["count"] == 1 and data['f"n']["p50"] == 0.5
+    text = registry.to_prometheus("lat")
+    assert "# TYPE lat summary" in text
+    assert 'lat{func="f\\"n",quantile="0.99"} 0.5' in text
+    assert 'lat_count{func="f\\"n"} 1' in text
+    registry.reset()
+    assert registry.snapshot()['f"n'].count == 0
+
+
+@pytest.mark.asyncio
+async def test_timers_record_latencies():
+    @timeit_sync
+    def func() -> None:
+        raise ValueError
+
+    @timeit_async
+    async def async_func() -> None:
+        return None
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            func()
+        await async_func()
+    snap = latencies.snapshot()
+    assert snap[f"{__name__}.{func.__qualname__}"].count == 3, "failed calls must be recorded"
+    assert snap[f"{__name__}.{async_func.__qualname__}"].count == 3
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from snippets.decorators.limit_decorator import ConcurrencyLimiter, TokenBucket, limited
+
+
+def test_token_bucket_spaces_sync_calls():
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    @limited(bucket)
+    def func(x: int) -> int:
+        return x
+
+    started = time.monotonic()
+    assert [func(i) for i in range(6)] == list(range(6))
+    elapsed = time.monotonic() - started
+    assert 0.18 <= elapsed < 0.4, "burst of 2, then 4 calls at 20/sec"
+    snapshot = bucket.wait_times.snapshot()
+    assert snapshot.count == 6 and snapshot.max_sec > 0.04
+
+
+def test_token_bucket_non_blocking():
+    bucket = TokenBucket(rate=1)
+
+    @limited(bucket, timeout=0)
+    def func() -> None:
+        pass
+
+    func()
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        func()
+    assert time.monotonic() - started < 0.05, "must fail fast without sleeping"
+    assert bucket.rejected == 1
+
+
+def test_token_bucket_shared_between_sync_and_async():
+    bucket = TokenBucket(rate=20)
+
+    @limited(bucket)
+    def sync_func() -> str:
+        return "sync"
+
+    @limited(bucket)
+    async def async_func() -> str:
+        return "async"
+
+    async def main() -> list[str]:
+        return await asyncio.gather(*(async_func() for _ in range(3)))
+
+    started = time.monotonic()
+    assert sync_func() == "sync"
+    assert asyncio.run(main()) == ["async"] * 3
+    assert time.monotonic() - started >= 0.14, "4 calls on a shared bucket at 20/sec"
+
+
+def test_token_bucket_refunds_cancelled_reservation():
+    bucket = TokenBucket(rate=10)
+
+    @limited(bucket)
+    async def func() -> None:
+        pass
+
+    async def main() -> None:
+        await func()
+        task = asyncio.create_task(func())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        started = time.monotonic()
+        await func()
+        assert time.monotonic() - started < 0.12, "cancelled caller must not keep its token"
+
+    asyncio.run(main())
+
+
+def test_concurrency_limiter_async():
+    limiter = ConcurrencyLimiter(2)
+    running = peak = 0
+
+    @limited(limiter)
+    async def func(x: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return x
+
+    async def main() -> list[int]:
+        return await asyncio.gather(*(func(i) for i in range(6)))
+
+    assert asyncio.run(main()) == list(range(6))
+    assert peak == 2 and limiter.in_use == 0
+    assert limiter.wait_times.snapshot().max_sec >= 0.09
+
+
+def test_concurrency_limiter_threads_and_timeout():
+    limiter = ConcurrencyLimiter(1)
+    entered = threading.Event()
+    leave = threading.Event()
+
+    @limited(limiter)
+    def hold() -> None:
+        entered.set()
+        leave.wait()
+
+    @limited(limiter, timeout=0.05)
+    def quick() -> str:
+        return "ok"
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    entered.wait()
+    with pytest.raises(TimeoutError):
+        quick()
+    assert limiter.rejected == 1
+    leave.set()
+    thread.join()
+    assert quick() == "ok" and limiter.in_use == 0
+
+
+def test_concurrency_limiter_passes_slot_on_async_timeout():
+    limiter = ConcurrencyLimiter(1)
+
+    @limited(limiter)
+    async def hold() -> None:
+        await asyncio.sleep(0.1)
+
+    @limited(limiter, timeout=0.02)
+    async def impatient() -> None:
+        pass
+
+    @limited(limiter)
+    async def patient() -> str:
+        return "ok"
+
+    async def main() -> None:
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await impatient()
+        assert await patient() == "ok"
+        await holder
+
+    asyncio.run(main())
+    assert limiter.in_use == 0 and limiter.rejected == 1
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        ConcurrencyLimiter(0)
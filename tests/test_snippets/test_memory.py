@@ -0,0 +1,61 @@
+import tracemalloc
+
+import pytest
+
+from snippets.decorators.events import format_event
+from snippets.decorators.memory import MemoryProfiler
+from snippets.decorators.timer_decorator import timeit_async, timeit_sync
+
+KEEP: list[bytes] = []
+
+
+@pytest.fixture(autouse=True)
+def clear_keep():
+    yield
+    KEEP.clear()
+
+
+def test_sampled_memory_stats(received):
+    @timeit_sync(memory_every=2, memory_top=3)
+    def allocate() -> None:
+        temp = bytearray(2_000_000)
+        KEEP.append(bytes(500_000))
+        del temp
+
+    for _ in range(4):
+        allocate()
+    memory = [event.memory for event in received]
+    assert memory[1] is None and memory[3] is None, "only every Nth call must be sampled"
+    for stats in (memory[0], memory[2]):
+        assert stats is not None
+        assert stats.peak_bytes >= 2_500_000, "temporary allocation must be in peak"
+        assert 500_000 <= stats.net_bytes < 600_000, "kept allocation must be in net"
+        assert any(site.startswith(__file__) and size >= 500_000 for site, size in stats.top)
+    assert "peak=" in format_event(received[0])
+    assert not tracemalloc.is_tracing(), "tracing must be stopped after sampled calls"
+
+
+@pytest.mark.asyncio
+async def test_async_memory_stats(received):
+    @timeit_async(memory_every=1, memory_top=0)
+    async def allocate() -> None:
+        KEEP.append(bytes(300_000))
+
+    await allocate()
+    stats = received[0].memory
+    assert stats is not None and stats.top == [] and stats.net_bytes >= 300_000
+
+
+def test_external_tracing_kept():
+    tracemalloc.start()
+    try:
+        profiler = MemoryProfiler(every=1, top=0)
+        profiler.stop(profiler.start())
+        assert tracemalloc.is_tracing(), "tracing started outside must stay on"
+    finally:
+        tracemalloc.stop()
+
+
+def test_profiler_validation():
+    with pytest.raises(ValueError):
+        MemoryProfiler(every=0)
@@ -0,0 +1,214 @@
+import asyncio
+import time
+
+import pytest
+
+from snippets.decorators.retry_decorator import (
+    CircuitBreaker,
+    CircuitState,
+    RetryBudget,
+    RetryPolicy,
+    _iter_delays,
+    retry,
+)
+
+
+def _flaky(failures: int):
+    """Функция, которая падает `failures` раз, а потом возвращает номер вызова."""
+    calls = []
+
+    def func() -> int:
+        calls.append(None)
+        if len(calls) <= failures:
+            raise ValueError(f"fail {len(calls)}")
+        return len(calls)
+
+    return func, calls
+
+
+def test_sync_retry_success():
+    func, calls = _flaky(2)
+    assert retry(count=3, delay_sec=0.01)(func)() == 3, "sync retry result fail"
+    assert len(calls) == 3, "sync retry attempts fail"
+
+
+def test_sync_retry_exhausted_without_last_sleep():
+    func, calls = _flaky(10)
+    started = time.monotonic()
+    assert retry(count=2, delay_sec=0.2)(func)() is None, "sync retry exhausted fail"
+    assert len(calls) == 2 and time.monotonic() - started < 0.35, "sync retry slept after last attempt"
+
+
+@pytest.mark.asyncio
+async def test_async_retry_awaits_coroutine():
+    sync_func, calls = _flaky(2)
+
+    @retry(count=3, delay_sec=0.01)
+    async def func() -> int:
+        await asyncio.sleep(0)
+        return sync_func()
+
+    assert await func() == 3, "async retry result fail"
+    assert len(calls) == 3, "async retry attempts fail"
+
+
+@pytest.mark.asyncio
+async def test_async_retry_does_not_block_loop():
+    func, _ = _flaky(1)
+
+    async def coroutine() -> int:
+        return func()
+
+    ticks = []
+
+    async def ticker() -> None:
+        for _ in range(5):
+            ticks.append(None)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(retry(count=2, delay_sec=0.1)(coroutine)(), ticker())
+    assert len(ticks) == 5, "async retry blocked event loop"
+
+
+@pytest.mark.asyncio
+async def test_async_retry_deadline_cuts_attempt():
+    calls = []
+
+    @retry(count=10, delay_sec=0.01, deadline_sec=0.2)
+    async def hang() -> None:
+        calls.append(None)
+        await asyncio.sleep(10)
+
+    started = time.monotonic()
+    assert await hang() is None, "async deadline result fail"
+    assert len(calls) == 1 and time.monotonic() - started < 0.5, "async deadline not applied"
+
+
+def test_sync_retry_deadline_stops_retries():
+    func, calls = _flaky(10)
+    started = time.monotonic()
+    assert retry(count=10, delay_sec=0.1, deadline_sec=0.25)(func)() is None, "sync deadline result fail"
+    assert len(calls) == 3 and time.monotonic() - started < 0.25, "sync deadline not applied"
+
+
+def test_delays():
+    delays = _iter_delays(1, 2, "none", max_delay_sec=5)
+    assert [next(delays) for _ in range(5)] == [1, 2, 4, 5, 5], "delays backoff fail"
+    full = _iter_delays(1, 2, "full", max_delay_sec=None)
+    assert all(0 <= next(full) <= 2**n for n in range(10)), "full jitter out of range"
+    decorrelated = _iter_delays(1, 1, "decorrelated", max_delay_sec=3)
+    assert all(1 <= next(decorrelated) <= 3 for _ in range(100)), "decorrelated jitter out of range"
+
+
+def test_retry_budget_limits_retries():
+    policy = RetryPolicy(budget=RetryBudget(ratio=0.5, max_tokens=2))
+    func, calls = _flaky(100)
+    wrapped = retry(count=5, delay_sec=0, policy=policy)(func)
+    assert wrapped() is None
+    assert len(calls) == 3, "budget must allow only max_tokens retries"
+    calls.clear()
+    wrapped()
+    assert len(calls) == 1, "empty budget must not allow retries"
+    wrapped()
+    assert len(calls) == 3, "each call must deposit ratio tokens"
+
+
+def test_circuit_breaker_fails_fast_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_sec=0.1)
+    policy = RetryPolicy(breaker=breaker)
+    func, calls = _flaky(3)
+    wrapped = retry(count=5, delay_sec=0.01, policy=policy)(func)
+
+    assert wrapped() is None
+    assert len(calls) == 2 and breaker.state is CircuitState.OPEN, "breaker must open after threshold"
+    started = time.monotonic()
+    assert wrapped() is None
+    assert len(calls) == 2 and time.monotonic() - started < 0.01, "open breaker must fail fast without sleep"
+
+    time.sleep(0.1)
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert wrapped() is None
+    assert len(calls) == 3 and breaker.state is CircuitState.OPEN, "failed probe must reopen breaker"
+
+    time.sleep(0.1)
+    assert wrapped() == 4
+    assert breaker.state is CircuitState.CLOSED, "successful probe must close breaker"
+
+
+def test_circuit_breaker_half_open_probe_limit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=0, half_open_max_calls=1)
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.allow(), "only one probe allowed in half-open"
+
+
+@pytest.mark.asyncio
+async def test_async_retry_shares_policy():
+    policy = RetryPolicy(breaker=CircuitBreaker(failure_threshold=2, reset_timeout_sec=60))
+    sync_func, calls = _flaky(100)
+
+    @retry(count=5, delay_sec=0, policy=policy)
+    async def func() -> int:
+        return sync_func()
+
+    assert await func() is None
+    assert retry(policy=policy)(sync_func)() is None
+    assert len(calls) == 2, "policy must be shared between sync and async wrappers"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_releases_half_open_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=0.05)
+    policy = RetryPolicy(breaker=breaker)
+    recovered = False
+
+    @retry(count=1, policy=policy)
+    async def call() -> str:
+        if not recovered:
+            await asyncio.sleep(1)
+            raise ValueError("down")
+        return "ok"
+
+    breaker.record_failure()
+    await asyncio.sleep(0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(call(), 0.05)
+    assert breaker.state is CircuitState.HALF_OPEN
+    recovered = True
+    assert await call() == "ok", "cancelled probe must give its slot back"
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_interrupted_sync_probe_releases_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=0)
+    breaker.record_failure()
+
+    @retry(count=1, policy=RetryPolicy(breaker=breaker))
+    def call() -> None:
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        call()
+    assert breaker.allow(), "interrupted probe must give its slot back"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_non_probe_keeps_half_open_limit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=0)
+
+    @retry(count=1, policy=RetryPolicy(breaker=breaker))
+    async def call() -> None:
+        await asyncio.sleep(1)
+
+    closed_call = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    breaker.record_failure()
+    probe = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    closed_call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await closed_call
+    assert not breaker.allow(), "call admitted in closed state must not free the probe slot"
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert breaker.allow() and not breaker.allow(), "probe frees only its own slot"
@@ -1,9 +1,18 @@
 import time
 import pytest
 import asyncio
+from snippets.decorators.events import events, print_sink
 from snippets.decorators.timer_decorator import timeit_sync, timeit_async
 
 
+@pytest.fixture(autouse=True)
+def printed_events():
+    """Без подписчиков декораторы молчат, поэтому для проверки вывода подписываем `print_sink`."""
+    unsubscribe = events.subscribe(print_sink)
+    yield
+    unsubscribe()
+
+
 # Синхронная функция для теста
 @timeit_sync
 def sync_function(x: float) -> None:
@@ -1,6 +1,22 @@
+import array
+import io
+import json
+import random
+import sys
 from types import MappingProxyType
 
-from snippets.flat_from_nested import get_flat_dict_from_nested_mapping
+import pytest
+
+from snippets import flat_from_nested
+from snippets.flat_from_nested import (
+    FlatView,
+    compile_flattener,
+    compile_key_filter,
+    get_flat_columns_from_records,
+    get_flat_dict_from_nested_mapping,
+    iter_flat_items_from_json,
+    unflatten,
+)
 
 
 def test_empty_mapping():
@@ -116,3 +132,299 @@ def test_immutable_mapping():
     inp = MappingProxyType({"a": "b", "c": {"d": "e"}, "f": {"y": {"z": 1}}})
     expected = {"a": "b", "c.d": "e", "f.y.z": 1}
     assert get_flat_dict_from_nested_mapping(inp) == expected, "immutable mapping fail"
+
+
+def test_keys_order_preserved():
+    inp = {"a": {"b": 1, "c": [2, {"d": 3}]}, "e": 4}
+    assert list(get_flat_dict_from_nested_mapping(inp)) == ["a.b", "a.c.0", "a.c.1.d", "e"], "keys order fail"
+
+
+def test_deeper_than_recursion_limit():
+    depth = sys.getrecursionlimit() * 2
+    nested: dict = {"leaf": "value"}
+    for _ in range(depth):
+        nested = {"k": nested}
+    flat = get_flat_dict_from_nested_mapping(nested)
+    assert flat == {".".join(["k"] * depth + ["leaf"]): "value"}, "deeper than recursion limit fail"
+
+
+def test_empty_nested_containers_dropped():
+    inp = {"a": {}, "b": [], "c": {"d": ()}, "e": 1}
+    assert get_flat_dict_from_nested_mapping(inp) == {"e": 1}, "empty nested containers fail"
+
+
+STREAM_DOC = {
+    "name": "Ravagh",
+    "tags": ["persian", "halal", {"price": 2.5e1, "open": True, "closed": None}],
+    "address": {"street": {"line1": "11 E 30th St", "line2": 'APT "1" \u2603'}, "zip": -10016},
+    "empty": {},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+@pytest.mark.parametrize(
+    "make_source",
+    [
+        json.dumps,
+        lambda doc: json.dumps(doc, indent=2, ensure_ascii=False).encode(),
+        lambda doc: io.StringIO(json.dumps(doc)),
+        lambda doc: io.BytesIO(json.dumps(doc, ensure_ascii=False).encode("utf-16")),
+    ],
+)
+def test_stream_matches_flat_dict(make_source, chunk_size):
+    items = list(iter_flat_items_from_json(make_source(STREAM_DOC), sep="/", chunk_size=chunk_size))
+    assert items == list(get_flat_dict_from_nested_mapping(STREAM_DOC, sep="/").items()), "stream flatten fail"
+
+
+def test_stream_is_lazy():
+    source = io.StringIO('[{"a": 1}, ' + "2, " * 10_000 + "3]")
+    items = iter_flat_items_from_json(source, chunk_size=16)
+    assert next(items) == ("0.a", 1), "stream lazy first item fail"
+    assert source.tell() < 64, "stream read too much before first item"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+def test_stream_escapes_across_chunks(chunk_size):
+    doc = {"a": 'x\\"y\\\\', "b": ['\\\\"', "\\u00e9\\n"], 'c"d': "\\\\"}
+    data = json.dumps(doc)
+    items = dict(iter_flat_items_from_json(data, chunk_size=chunk_size))
+    assert items == get_flat_dict_from_nested_mapping(json.loads(data)), "escaped quotes across chunks fail"
+
+
+def test_stream_long_string_is_linear(monkeypatch):
+    find_closing_quote = flat_from_nested._find_closing_quote
+    scanned = 0
+
+    def counting_find_closing_quote(text, start, escaped):
+        nonlocal scanned
+        scanned += len(text) - start
+        return find_closing_quote(text, start, escaped)
+
+    monkeypatch.setattr(flat_from_nested, "_find_closing_quote", counting_find_closing_quote)
+    value = "x" * 1_000_000
+    doc = json.dumps({"a": value, "b": 1})
+    items = list(iter_flat_items_from_json(io.StringIO(doc), chunk_size=1024))
+    assert items == [("a", value), ("b", 1)]
+    assert scanned <= 2 * len(doc), "long string must not be rescanned after every chunk"
+
+
+@pytest.mark.parametrize("doc", ["", "42", '{"a": 1,}', "[1 2]", '{"a": 1} x', '["abc'])
+def test_stream_invalid_json(doc):
+    with pytest.raises(ValueError):
+        list(iter_flat_items_from_json(doc, chunk_size=2))
+
+
+def test_columns_from_records():
+    records = [
+        {"name": "a", "address": {"zip": 1}},
+        {"name": "b", "address": {"zip": 2}},
+        {"name": "c", "address": {"zip": 3, "city": "NY"}, "tags": ["x"]},
+        {"name": "d", "address": {"zip": 4}},
+        {},
+    ]
+    expected = {
+        "name": ["a", "b", "c", "d", None],
+        "address.zip": [1, 2, 3, 4, None],
+        "address.city": [None, None, "NY", None, None],
+        "tags.0": [None, None, "x", None, None],
+    }
+    assert get_flat_columns_from_records(records) == expected, "columns from records fail"
+
+
+def test_columns_same_shape_other_nesting():
+    records = [{"a": {"x": 1}, "b": 2}, {"a": 1, "b": {"x": 2}}]
+    expected = {"a.x": [1, None], "b": [2, None], "a": [None, 1], "b.x": [None, 2]}
+    assert get_flat_columns_from_records(records) == expected, "columns other nesting fail"
+
+
+def test_columns_equal_keys_of_other_types():
+    records = [{1: "x"}, {True: "y"}, {1.0: "z"}, {1: "w"}]
+    expected = {"1": ["x", None, None, "w"], "True": [None, "y", None, None], "1.0": [None, None, "z", None]}
+    assert get_flat_columns_from_records(records) == expected, "columns key type fail"
+
+
+def test_columns_typecodes_and_fill_value():
+    records = [{"a": {"b": 1.5}, "c": 1}, {"c": 2}, {"a": {"b": 2.5}, "c": 3}]
+    columns = get_flat_columns_from_records(records, fill_value=0, typecodes={"a.b": "d", "c": "q"})
+    assert columns["a.b"] == array.array("d", [1.5, 0, 2.5]), "columns typecode fail"
+    assert columns["c"] == array.array("q", [1, 2, 3]), "columns typecode fail"
+
+
+@pytest.mark.parametrize("fill_value", [None, 2**64, "x"])
+def test_columns_typecodes_incompatible_fill_value(fill_value):
+    with pytest.raises(ValueError, match="'c'"):
+        get_flat_columns_from_records([{"c": 1}], fill_value=fill_value, typecodes={"c": "q"})
+
+
+REAL_DATA = {
+    "name": "Ravagh",
+    "address": {"street": {"line1": "11 E 30th St", "line2": "APT 1"}, "zip": 10016},
+    "tags": ["persian", {"halal": True}],
+}
+
+
+def test_compiled_flattener_same_shape():
+    flatten = compile_flattener(
+        {"name": str, "address": {"street": {"line1": str, "line2": str}, "zip": int}, "tags": [str, {"halal": bool}]},
+        sep="/",
+    )
+    assert flatten(REAL_DATA) == get_flat_dict_from_nested_mapping(REAL_DATA, sep="/"), "compiled same shape fail"
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {**REAL_DATA, "extra": 1},
+        {"name": "Ravagh", "address": {"zip": 10016}, "tags": []},
+        {**REAL_DATA, "name": {"first": "Ravagh"}},
+        {**REAL_DATA, "tags": ["persian", "halal"]},
+        {**REAL_DATA, "tags": ("persian", MappingProxyType({"halal": True}))},
+        MappingProxyType(REAL_DATA),
+        [1, 2],
+    ],
+)
+def test_compiled_flattener_fallback(record):
+    flatten = compile_flattener(REAL_DATA)
+    assert flatten(record) == get_flat_dict_from_nested_mapping(record), "compiled fallback fail"
+
+
+@pytest.mark.parametrize(
+    "record", [{1: "v", "a": {2: "w"}}, {True: "v", "a": {2: "w"}}, {1: "v", "a": {2.0: "w"}}, {"a": {2: "w"}, 1: "v"}]
+)
+def test_compiled_flattener_equal_keys_of_other_types(record):
+    flatten = compile_flattener({1: "x", "a": {2: "y"}})
+    assert flatten(record) == get_flat_dict_from_nested_mapping(record), "compiled key type fail"
+
+
+def test_compiled_flattener_cached():
+    assert compile_flattener(REAL_DATA) is compile_flattener({**REAL_DATA, "name": "other"}), "compiled cache fail"
+    assert compile_flattener(REAL_DATA) is not compile_flattener(REAL_DATA, sep="/"), "compiled cache sep fail"
+
+
+def test_flat_view_matches_flat_dict():
+    view = FlatView(REAL_DATA, sep="/")
+    expected = get_flat_dict_from_nested_mapping(REAL_DATA, sep="/")
+    assert dict(view) == dict(view.items()) == view.to_dict() == expected, "flat view fail"
+    assert list(view) == list(expected) and len(view) == len(expected), "flat view keys fail"
+
+
+def test_flat_view_getitem():
+    view = FlatView({"a": {"b.c": 1, "b": {"d": 2}}, "e": [{"f": 3}], 7: {"g": 4}, "h": set()})
+    assert view["a.b.c"] == 1, "flat view key with sep fail"
+    assert view["a.b.d"] == 2, "flat view nested fail"
+    assert view["e.0.f"] == 3, "flat view list fail"
+    assert view["7.g"] == 4, "flat view int key fail"
+    for missing in ("a", "a.b", "e.1.f", "e.00.f", "e.-1.f", "h", "zz", 7):
+        assert missing not in view, f"flat view missing {missing!r} fail"
+
+
+@pytest.mark.parametrize(
+    "inp",
+    [
+        {"a.b": 1, "a": {"b": 2}},
+        {"a": {"b": 2}, "a.b": 1},
+        {1: {"x": 2}, "1": {"x": 2}},
+        {"": {"a.b": 1}, "a": {"b": 2}},
+    ],
+)
+def test_flat_view_colliding_keys(inp):
+    view = FlatView(inp)
+    assert list(view) == list(view.to_dict()) and len(view) == 1, "flat view duplicate keys fail"
+    assert dict(view.items()) == {key: view[key] for key in view} == {list(view)[0]: 2}, "flat view collision fail"
+    assert view == view.to_dict(), "flat view to_dict collision fail"
+
+
+def test_flat_view_is_live():
+    inp = {"a": {"b": 1}}
+    view = FlatView(inp)
+    inp["a"]["c"] = 2
+    assert view["a.c"] == 2 and len(view) == 2, "flat view live fail"
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected"),
+    [
+        ({"include": ["name"]}, {"name": "Ravagh"}),
+        ({"include": ["address.street"]}, {"address.street.line1": "11 E 30th St", "address.street.line2": "APT 1"}),
+        ({"include": ["address.*.line1", "tags.1"]}, {"address.street.line1": "11 E 30th St", "tags.1.halal": True}),
+        ({"include": ["*.line*"]}, {}),
+        ({"include": []}, {}),
+        ({"exclude": ["address", "tags.0"]}, {"name": "Ravagh", "tags.1.halal": True}),
+        ({"include": ["address"], "exclude": ["*.street"]}, {"address.zip": 10016}),
+        (
+            {"max_depth": 2},
+            {
+                "name": "Ravagh",
+                "address.street": REAL_DATA["address"]["street"],
+                "address.zip": 10016,
+                "tags.0": "persian",
+                "tags.1": {"halal": True},
+            },
+        ),
+        ({"max_depth": 1, "include": ["tags"]}, {"tags": REAL_DATA["tags"]}),
+    ],
+)
+def test_flat_dict_key_filter(kwargs, expected):
+    assert get_flat_dict_from_nested_mapping(REAL_DATA, **kwargs) == expected, "key filter fail"
+
+
+def test_flat_dict_key_filter_custom_sep():
+    flat = get_flat_dict_from_nested_mapping(REAL_DATA, sep="/", include=["address/street/line2"])
+    assert flat == {"address/street/line2": "APT 1"}, "key filter custom sep fail"
+
+
+def test_key_filter_compiled_once():
+    key_filter = compile_key_filter(["a.b"], max_depth=3)
+    assert key_filter is compile_key_filter(("a.b",), max_depth=3), "key filter cache fail"
+    with pytest.raises(ValueError):
+        compile_key_filter(max_depth=0)
+
+
+def test_precompiled_key_filter():
+    key_filter = compile_key_filter(["address.*.line1"], exclude=["tags"])
+    flat = get_flat_dict_from_nested_mapping(REAL_DATA, key_filter=key_filter)
+    assert flat == get_flat_dict_from_nested_mapping(REAL_DATA, include=["address.*.line1"], exclude=["tags"])
+    assert flat == {"address.street.line1": "11 E 30th St"}, "precompiled key filter fail"
+    with pytest.raises(ValueError):
+        get_flat_dict_from_nested_mapping(REAL_DATA, key_filter=key_filter, max_depth=2)
+    with pytest.raises(ValueError):
+        get_flat_dict_from_nested_mapping(REAL_DATA, key_filter=key_filter, sep="/")
+
+
+def _random_nested(rnd: random.Random, depth: int = 0) -> dict | list:
+    """Вложенная структура без пустых контейнеров и без словарей с ключами-индексами - flatten её не теряет."""
+    if rnd.random() < 0.3:
+        return [
+            _random_nested(rnd, depth + 1) if depth < 4 and rnd.random() < 0.4 else rnd.choice([1, "x", None, 2.5])
+            for _ in range(rnd.randint(1, 4))
+        ]
+    return {
+        f"{rnd.choice('abc')}{i}": (
+            _random_nested(rnd, depth + 1) if depth < 4 and rnd.random() < 0.4 else rnd.choice([1, "x", None, 2.5])
+        )
+        for i in range(rnd.randint(1, 4))
+    }
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_unflatten_round_trip(seed):
+    rnd = random.Random(seed)
+    nested = _random_nested(rnd)
+    sep = rnd.choice([".", "/", "__"])
+    flat = get_flat_dict_from_nested_mapping(nested, sep=sep)
+    assert unflatten(flat, sep=sep) == nested, "unflatten round trip fail"
+    assert get_flat_dict_from_nested_mapping(unflatten(flat, sep=sep), sep=sep) == flat, "flatten round trip fail"
+
+
+def test_unflatten_lists():
+    flat = {"a.1": "y", "a.0": "x", "b.0": 1, "b.2": 2, "c.00": 3, "0": 4}
+    assert unflatten(flat) == {"a": ["x", "y"], "b": {"0": 1, "2": 2}, "c": {"00": 3}, "0": 4}, "unflatten lists fail"
+    assert unflatten({"a.0": 1}, lists=False) == {"a": {"0": 1}}, "unflatten without lists fail"
+    assert unflatten({"0.a": 1, "1": 2}) == [{"a": 1}, 2], "unflatten root list fail"
+    assert unflatten({}) == {}, "unflatten empty fail"
+
+
+@pytest.mark.parametrize("flat", [{"a": 1, "a.b": 2}, {"a.b": 2, "a": 1}, {"a.b.c": 1, "a.b": 2}])
+def test_unflatten_conflict(flat):
+    with pytest.raises(ValueError):
+        unflatten(flat)
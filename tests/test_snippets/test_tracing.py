@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from snippets.decorators.timer_decorator import timeit_async, timeit_sync
+from snippets.decorators.tracing import current_span, trace_span, traced, tracer
+
+
+@pytest.fixture(autouse=True)
+def clean_tracer():
+    tracer.clear()
+    yield
+    tracer.clear()
+
+
+def test_sync_nesting_and_self_time():
+    @traced
+    def inner() -> None:
+        time.sleep(0.05)
+
+    with trace_span("outer") as outer:
+        inner()
+        time.sleep(0.02)
+        with trace_span("second") as second:
+            pass
+
+    inner_span, second_span, outer_span = tracer.finished
+    assert outer_span is outer and second_span is second
+    assert inner_span.parent is outer and second.parent is outer and outer.parent is None
+    assert current_span.get() is None, "context must be restored"
+    assert outer.total_sec >= 0.07
+    assert 0.02 <= outer.self_sec < outer.total_sec - 0.045, "self time must exclude children"
+    assert inner_span.self_sec == pytest.approx(inner_span.total_sec)
+
+
+@pytest.mark.asyncio
+async def test_gather_children_keep_parent():
+    @timeit_async(trace=True)
+    async def child(t: float) -> None:
+        await asyncio.sleep(t)
+
+    @traced
+    async def parent() -> None:
+        await asyncio.gather(*(child(0.05) for _ in range(5)))
+
+    await parent()
+    *children, parent_span = tracer.finished
+    assert len(children) == 5 and all(span.parent is parent_span for span in children)
+    assert parent_span.self_sec < 0.03, "overlapping children must not be summed"
+    assert parent_span.self_sec >= 0
+    assert len({span.tid for span in children}) == 5, "tasks must get separate lanes"
+
+
+def test_span_exception_still_finished():
+    with pytest.raises(ValueError):
+        with trace_span("fail"):
+            raise ValueError
+    assert [span.name for span in tracer.finished] == ["fail"]
+    assert current_span.get() is None
+
+
+def test_chrome_trace_export():
+    with trace_span("outer"):
+        with trace_span("inner"):
+            pass
+    data = json.loads(tracer.to_chrome_json())
+    inner, outer = data["traceEvents"]
+    assert inner["ph"] == outer["ph"] == "X"
+    assert inner["args"]["parent_id"] == outer["args"]["span_id"]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert inner["tid"] == outer["tid"] == 1
+
+
+def test_timers_do_not_trace_by_default():
+    @timeit_sync
+    def func() -> None:
+        pass
+
+    with trace_span("outer") as outer:
+        for _ in range(100):
+            func()
+    assert list(tracer.finished) == [outer], "untraced timer must not create spans"
+
+
+def test_long_lived_parent_folds_children():
+    with trace_span("outer") as outer:
+        for _ in range(1000):
+            with trace_span("child"):
+                pass
+        assert not outer._intervals and not outer._open, "finished children must be folded into covered time"
+        time.sleep(0.02)
+    assert 0.02 <= outer.self_sec < outer.total_sec